@@ -0,0 +1,158 @@
+import argparse
+import os
+import random
+import sys
+
+# Settings
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SEED = 2024  # Same seed, same bytes: fixtures only change when this file does
+LISTING_ROWS = 25  # Players per footballtransfers listing page
+TRANSFER_ROWS = 12
+FBREF_SEASONS = 10
+FBREF_TABLES = 12  # Tables per all-competitions page, half of them commented out
+
+FIRST_NAMES = ["Erling", "Lamine", "Jude", "Kylian", "Bukayo", "Pedri", "Florian", "Martin", "Jamal", "Vinícius"]
+LAST_NAMES = ["Haaland", "Yamal", "Bellingham", "Mbappé", "Saka", "González", "Wirtz", "Ødegaard", "Musiala", "Júnior"]
+CLUBS = ["Man City", "Barcelona", "Real Madrid", "Arsenal", "Leverkusen", "Bayern", "Liverpool", "Inter", "PSG", "Napoli"]
+NATIONS = ["Norway", "Spain", "England", "France", "Germany", "Brazil", "Portugal", "Italy", "Netherlands", "Belgium"]
+POSITIONS = ["F (C)", "AM (R)", "M, AM (R)", "DM", "D (C)", "D (LC)", "GK", "AM (RL), F (C)"]
+FEES = ["€12.5M", "€500K", "Loan", "Free transfer", "End of loan", "€1.2M", "-", "€85M"]
+STATS = ["MP", "Starts", "Min", "90s", "Gls", "Ast", "G+A", "G-PK", "PK", "PKatt", "CrdY", "CrdR", "xG", "npxG", "xAG", "PrgC", "PrgP", "PrgR"]
+
+
+def slug(text):
+    return "-".join(text.lower().split())
+
+
+def player_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+# 📄 footballtransfers most-valuable listing page
+def listing_page(rng):
+    rows = []
+    for _ in range(LISTING_ROWS):
+        name, club = player_name(rng), rng.choice(CLUBS)
+        rows.append(
+            f"""<tr>
+<td class="td-rank">{rng.randint(1, 9999)}</td>
+<td class="td-player"><div class="player-info">
+<figure><img src="/flags/{slug(club)}.svg" alt="{rng.choice(NATIONS)}" width="16"></figure>
+<a href="/en/players/{slug(name)}" title="{name}">{name}</a>
+<span class="sub-text"><a href="/en/teams/uk/{slug(club)}" title="{club}">{club}</a> • {rng.choice(POSITIONS)}</span>
+</div></td>
+<td class="age">{rng.randint(16, 38)}</td>
+<td class="td-skill"><div class="table-skill"><div class="table-skill__skill">{rng.uniform(50, 95):.1f}</div><div class="table-skill__pot">{rng.uniform(60, 99):.1f}</div></div></td>
+<td class="td-value"><span class="player-tag">€{rng.uniform(1, 200):.1f}{rng.choice("MK")}</span></td>
+</tr>"""
+        )
+    return (
+        "<html><head><title>Most valuable players</title></head><body>"
+        '<table class="table table-hover"><thead><tr><th>#</th><th>Player</th><th>Age</th>'
+        "<th>Skill</th><th>Value</th></tr></thead><tbody>\n" + "\n".join(rows) + "\n</tbody></table></body></html>"
+    )
+
+
+# 📄 footballtransfers /transfer-history page
+def transfer_page(rng):
+    rows = []
+    for _ in range(TRANSFER_ROWS):
+        from_club, to_club = rng.sample(CLUBS, 2)
+        rows.append(
+            f"""<tr><td>{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2010, 2025)}</td>
+<td><div class="transfer-club"><span class="transfer-club__name">{from_club}</span></div>
+<div class="transfer-club"><span class="transfer-club__name">{to_club}</span></div></td>
+<td>{rng.choice(FEES)}</td></tr>"""
+        )
+    return (
+        f"<html><body><h1>{player_name(rng)}</h1><table><thead><tr><th>Date</th><th>Clubs</th>"
+        "<th>Fee</th></tr></thead><tbody>\n" + "\n".join(rows) + "\n</tbody></table></body></html>"
+    )
+
+
+def fbref_table(rng, table_id):
+    header = "".join(f"<th>{h}</th>" for h in ["Season", "Age", "Squad", "Country", "Comp", *STATS])
+    rows = []
+    for season in range(2025 - FBREF_SEASONS, 2025):
+        club = rng.choice(CLUBS)
+        cells = [
+            f'<th><a href="/en/players/1f44ac21/{season}-{season + 1}">{season}-{season + 1}</a></th>',
+            f"<td>{season - 2000}</td>",
+            f'<td><a href="/en/squads/b8fd03ef/{slug(club)}">{club}</a></td>',
+            "<td>eng ENG</td>",
+            '<td><a href="/en/comps/9/Premier-League-Stats">1. Premier League</a></td>',
+        ] + [f"<td>{rng.randint(0, 3000):,}</td>" for _ in STATS]
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    return (
+        f'<table id="{table_id}"><thead><tr><th colspan="5"></th><th colspan="{len(STATS)}">Stats</th></tr>'
+        f"<tr>{header}</tr></thead><tbody>" + "".join(rows) + "</tbody></table>"
+    )
+
+
+# 📄 fbref /all_comps/ page: live tables plus the ones shipped inside HTML comments
+def fbref_all_comps_page(rng):
+    blocks = []
+    for i in range(FBREF_TABLES):
+        table = fbref_table(rng, f"stats_table_{i}")
+        blocks.append(f"<div><!--\n{table}\n--></div>" if i % 2 else f"<div>{table}</div>")
+    return "<html><body><h1><span>Erling Haaland</span></h1>" + "\n".join(blocks) + "</body></html>"
+
+
+# 📄 fbref player profile page
+def fbref_profile_page(rng):
+    honours = "\n".join(f"* {rng.randint(1, 5)}x {title}" for title in ["Premier League", "Golden Boot", "Champions League"])
+    return f"""<html><body><div id="meta">
+<h1><span>{player_name(rng)}</span></h1>
+<p><strong>Born:</strong> <span id="necro-birth" data-birth="2000-07-21">July 21, 2000</span>
+<span>in</span> <span>Leeds, England</span></p>
+<p><strong>Wages</strong> <span style="color:#932a12">£375,000 Weekly</span></p>
+<p><a href="https://www.instagram.com/erling/">Instagram</a></p>
+<span id="bling-alt-text">
+{honours}
+</span>
+</div></body></html>"""
+
+
+PAGES = {
+    "listing": listing_page,
+    "transfer_history": transfer_page,
+    "fbref_all_comps": fbref_all_comps_page,
+    "fbref_profile": fbref_profile_page,
+}
+
+
+def write_fixture(name, html):
+    path = os.path.join(FIXTURES_DIR, name)
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(html)
+    print(f"✅ {path} ({len(html):,} bytes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the frozen benchmark fixtures")
+    parser.add_argument("--pages", type=int, default=3, help="generated pages per kind")
+    parser.add_argument(
+        "--freeze",
+        nargs=2,
+        action="append",
+        metavar=("KIND", "URL"),
+        help="also freeze a real page from the page cache, e.g. --freeze listing <url>",
+    )
+    args = parser.parse_args()
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    rng = random.Random(SEED)
+    for kind, make_page in PAGES.items():
+        for i in range(args.pages):
+            write_fixture(f"{kind}_{i}.html", make_page(rng))
+
+    if args.freeze:
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        import page_cache
+
+    for kind, url in args.freeze or []:
+        html = page_cache.default_cache().get_text(url, ttl=float("inf"))
+        if html is None:
+            print(f"⚠️ {url} is not in the page cache; fetch it once first")
+            continue
+        write_fixture(f"{kind}_{slug(url.rstrip('/').split('/')[-1])}.html", html)
@@ -0,0 +1,142 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extract_extra_info_player_fbref import parse_player_profile  # noqa: E402
+from fbref_tables import extract_tables  # noqa: E402
+from listing_parsers import HTMLParser, lxml, parse_html  # noqa: E402
+from transfer_history import parse_fee, parse_transfer_history  # noqa: E402
+
+# Settings
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, "fixtures")
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+MIN_SECONDS = 1.0  # Each case repeats over its fixtures for at least this long
+MIN_ROUNDS = 3
+SPEED_TOLERANCE = 0.25  # Fail when rows/s drops by more than this fraction of the baseline
+MEMORY_TOLERANCE = 0.25  # Fail when peak memory grows by more than this fraction...
+MEMORY_SLACK_KB = 256  # ...plus this much, so interpreter noise on tiny parsers does not fail a run
+
+
+# Raw fee cells of a transfer-history fixture, so parse_fee is timed on its own
+def _fee_strings(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return [
+        cells[2].get_text(strip=True)
+        for cells in (tr.find_all("td") for tr in soup.select("table tbody tr"))
+        if len(cells) >= 3
+    ]
+
+
+# case → (fixture kind, prepare(html) → input, run(input) → rows produced)
+CASES = {
+    **{
+        f"listing[{engine}]": ("listing", None, lambda html, engine=engine: len(parse_html(html, engine)))
+        for engine, module in [("bs4", True), ("lxml", lxml), ("selectolax", HTMLParser)]
+        if module is not None
+    },
+    "transfer_history": ("transfer_history", None, lambda html: len(parse_transfer_history(html, 0, "bench"))),
+    "parse_fee": ("transfer_history", _fee_strings, lambda fees: len([parse_fee(fee) for fee in fees])),
+    "fbref_tables": ("fbref_all_comps", None, lambda html: sum(len(df) for df in extract_tables(html).values())),
+    "fbref_profile": ("fbref_profile", None, lambda html: 1 if parse_player_profile(html)["name"] != "N/A" else 0),
+}
+
+
+def load_inputs(kind, prepare):
+    inputs = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, f"{kind}_*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        inputs.append(prepare(html) if prepare else html)
+    return inputs
+
+
+# ⏱️ Best round's rows/s, plus the peak traced memory of one extra round
+def measure(run, inputs):
+    rounds = []
+    started = time.perf_counter()
+    while len(rounds) < MIN_ROUNDS or time.perf_counter() - started < MIN_SECONDS:
+        start = time.perf_counter()
+        rows = sum(run(item) for item in inputs)
+        rounds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    for item in inputs:
+        run(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"rows": rows, "rows_per_s": rows / min(rounds), "peak_kb": peak / 1024}
+
+
+def compare(name, result, baseline):
+    if baseline is None:
+        return []
+    problems = []
+    if result["rows"] != baseline["rows"]:
+        problems.append(f"{name}: {result['rows']} rows, baseline had {baseline['rows']}")
+    if result["rows_per_s"] < baseline["rows_per_s"] * (1 - SPEED_TOLERANCE):
+        problems.append(
+            f"{name}: {result['rows_per_s']:,.0f} rows/s vs baseline {baseline['rows_per_s']:,.0f}"
+        )
+    if result["peak_kb"] > baseline["peak_kb"] * (1 + MEMORY_TOLERANCE) + MEMORY_SLACK_KB:
+        problems.append(f"{name}: peak {result['peak_kb']:,.0f} KB vs baseline {baseline['peak_kb']:,.0f} KB")
+    return problems
+
+
+# 🚀 Main Execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parser benchmarks over the frozen fixtures")
+    parser.add_argument("cases", nargs="*", help=f"subset of: {', '.join(CASES)}")
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite baseline.json with this run")
+    args = parser.parse_args()
+
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            baselines = json.load(f)["cases"]
+    elif not args.save_baseline:
+        # Never accept whatever code happens to be checked out as its own reference
+        print(f"❌ {BASELINE_PATH} is missing; restore it from git or create one with --save-baseline")
+        sys.exit(2)
+
+    results, problems = {}, []
+    print(f"{'case':<22}{'rows':>8}{'rows/s':>14}{'peak KB':>12}{'vs baseline':>14}")
+    for name in args.cases or CASES:
+        kind, prepare, run = CASES[name]
+        inputs = load_inputs(kind, prepare)
+        if not inputs:
+            print(f"⚠️ {name}: no {kind}_*.html fixtures; run make_fixtures.py")
+            continue
+        result = measure(run, inputs)
+        results[name] = result
+        baseline = baselines.get(name)
+        change = f"{result['rows_per_s'] / baseline['rows_per_s'] - 1:+.0%}" if baseline else "new"
+        print(f"{name:<22}{result['rows']:>8}{result['rows_per_s']:>14,.0f}{result['peak_kb']:>12,.0f}{change:>14}")
+        if baseline is None:
+            problems.append(f"{name}: not in baseline.json; add it with --save-baseline")
+        problems += compare(name, result, baseline)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(
+                {"python": platform.python_version(), "machine": platform.machine(), "cases": {**baselines, **results}},
+                f,
+                indent=2,
+            )
+        print(f"💾 Baseline saved → {BASELINE_PATH}")
+    elif problems:
+        print("\n❌ Regressions against baseline.json:")
+        for problem in problems:
+            print(f"   {problem}")
+        sys.exit(1)
+    else:
+        print("\n✅ Within tolerance of baseline.json")
@@ -0,0 +1,152 @@
+import asyncio
+import contextlib
+import re
+import time
+
+from proxy_pool import playwright_proxy
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Settings
+POOL_SIZE = 4  # Browser contexts, one reusable page each
+MAX_NAVIGATIONS_PER_CONTEXT = 200  # Context is thrown away and rebuilt after this many
+MAX_BROWSER_RSS_MB = 1500  # Recycle when Chromium's processes grow past this (needs psutil)
+RSS_CHECK_EVERY = 20  # Navigations between memory checks
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet", "texttrack", "eventsource", "websocket", "manifest"}
+BLOCKED_URL_RE = re.compile(
+    r"googletagmanager|google-analytics|doubleclick|googlesyndication|adservice|"
+    r"amazon-adsystem|scorecardresearch|quantserve|criteo|taboola|outbrain|"
+    r"facebook\.net|hotjar|adnxs|pubmatic|rubiconproject"
+)
+
+
+# 🚫 Only documents, scripts and XHR go out
+async def block_assets(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_URL_RE.search(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def chromium_rss_mb():
+    if psutil is None:
+        return 0
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            if "chrom" in child.name().lower():
+                total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / 1024**2
+
+
+class BrowserUnavailable(Exception):
+    pass
+
+
+class _Slot:
+    def __init__(self, context, page, proxy=None):
+        self.context = context
+        self.page = page
+        self.proxy = proxy
+        self.navigations = 0
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        browser,
+        size=POOL_SIZE,
+        max_navigations=MAX_NAVIGATIONS_PER_CONTEXT,
+        max_rss_mb=MAX_BROWSER_RSS_MB,
+        context_options=None,
+        proxies=None,
+    ):
+        self.browser = browser
+        self.size = size
+        self.max_navigations = max_navigations
+        self.max_rss_mb = max_rss_mb
+        self.context_options = context_options or {}
+        self.proxies = proxies  # ProxyPool: every context egresses through its own proxy
+        self.recycled = 0
+        self._idle = asyncio.Queue()
+        self._uses = 0
+
+    async def __aenter__(self):
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._new_slot())
+        return self
+
+    async def __aexit__(self, *exc):
+        while not self._idle.empty():
+            slot = self._idle.get_nowait()
+            if slot.context is None:
+                continue
+            await slot.context.close()
+            if slot.proxy:
+                self.proxies.release(slot.proxy)
+
+    async def _new_slot(self):
+        options = dict(self.context_options)
+        proxy = self.proxies.try_acquire() if self.proxies else None
+        if proxy:
+            options["proxy"] = playwright_proxy(proxy)
+        context = await self.browser.new_context(**options)
+        await context.route("**/*", block_assets)
+        return _Slot(context, await context.new_page(), proxy)
+
+    # Never raises: when no new context can be opened, an empty slot goes back and is rebuilt on next use
+    async def _recycle(self, slot):
+        self.recycled += 1
+        if slot.context is not None:
+            with contextlib.suppress(Exception):
+                await slot.context.close()
+        if slot.proxy:
+            self.proxies.release(slot.proxy)
+        try:
+            return await self._new_slot()
+        except Exception as e:
+            print(f"⚠️ Could not open a browser context: {e}")
+            return _Slot(None, None)
+
+    def _over_memory(self):
+        self._uses += 1
+        if psutil is None or self._uses % RSS_CHECK_EVERY:
+            return False
+        return chromium_rss_mb() > self.max_rss_mb
+
+    # 📄 Borrow a warm page; a page that raised is handed back on a fresh context
+    @contextlib.asynccontextmanager
+    async def page(self):
+        slot = await self._idle.get()
+        try:
+            if (
+                slot.page is None
+                or slot.navigations >= self.max_navigations
+                or self._over_memory()
+                or slot.proxy and not self.proxies.is_healthy(slot.proxy)
+            ):
+                slot = await self._recycle(slot)
+                if slot.page is None:
+                    raise BrowserUnavailable("No browser context could be opened")
+            slot.navigations += 1
+            start = time.perf_counter()
+            yield slot.page
+            if slot.proxy:
+                self.proxies.report(slot.proxy, True, time.perf_counter() - start)
+        except BaseException:
+            if slot.page is not None:
+                if slot.proxy:
+                    self.proxies.report(slot.proxy, False)
+                slot = await self._recycle(slot)
+            raise
+        finally:
+            if slot.page is not None and slot.page.is_closed():
+                slot = await self._recycle(slot)
+            # Always handed back, so failed rebuilds cannot drain the pool
+            self._idle.put_nowait(slot)
@@ -1,36 +1,18 @@
 import csv
+import itertools
+import os
+import sys
+import time
 
 import pandas as pd
 
-fixed_rows = []
+# Settings
+SOURCE_CSV = "most_valuable_players_fast.csv"
+OUTPUT_CSV = "all_players_ratings_original.csv"
+QUARANTINE_CSV = "most_valuable_players_quarantine.csv"
+CHUNK_ROWS = 100_000  # Lines held in memory at once
 expected_columns = 10
 
-with open("most_valuable_players_fast.csv", "r", encoding="utf-8") as f:
-    for line in f:
-        line = line.strip()
-
-        # If entire line is wrapped in quotes, unwrap it first
-        if line.startswith('"') and line.endswith('"'):
-            line = line[1:-1]
-
-        # Fix escaped quotes like ""M, AM (R)"" to "M, AM (R)"
-        line = line.replace('""', '"')
-
-        # Parse line using csv.reader for proper quote handling
-        parsed = next(csv.reader([line], quotechar='"', skipinitialspace=True))
-
-        # If the row looks good, keep it
-        if len(parsed) == expected_columns:
-            fixed_rows.append(parsed)
-        elif len(parsed) > expected_columns:
-            # Try merging overflow into Positions field
-            repaired = parsed[:5] + [", ".join(parsed[5:-4])] + parsed[-4:]
-            if len(repaired) == expected_columns:
-                fixed_rows.append(repaired)
-            else:
-                print(f"Could not fix row: {parsed}")
-
-# Load into DataFrame
 columns = [
     "Name",
     "Player URL",
@@ -43,19 +25,116 @@ columns = [
     "Potential",
     "Value",
 ]
-df = pd.DataFrame(fixed_rows, columns=columns)
-
-# Convert numeric columns
-for col in ["Age", "Rating", "Potential", "Value"]:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
-
-df = df.drop(index=0).reset_index(drop=True)
 # Define the redundant prefix
 prefix = "https://www.footballtransfers.com"
 
-# Fix repeated prefix in all relevant URL columns
-for col in ["Player URL", "Team Link"]:
-    if col in df.columns:
+
+# One reusable csv.reader, fed a single line per next() call
+class _LineFeed:
+    line = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.line is None:
+            raise StopIteration
+        line, self.line = self.line, None
+        return line
+
+
+_feed = _LineFeed()
+_reader = csv.reader(_feed, quotechar='"', skipinitialspace=True)
+
+
+# Returns (fields, None) for a usable row or (None, reason) for the quarantine
+def repair_line(line):
+    line = line.strip()
+
+    # If entire line is wrapped in quotes, unwrap it first
+    if line.startswith('"') and line.endswith('"'):
+        line = line[1:-1]
+
+    # Fix escaped quotes like ""M, AM (R)"" to "M, AM (R)"
+    line = line.replace('""', '"')
+
+    # Parse line using csv.reader for proper quote handling
+    _feed.line = line
+    parsed = next(_reader, [])
+
+    # If the row looks good, keep it
+    if len(parsed) == expected_columns:
+        if parsed[0] == "Name":
+            return None, "header row"
+        return parsed, None
+    elif len(parsed) > expected_columns:
+        # Try merging overflow into Positions field
+        repaired = parsed[:5] + [", ".join(parsed[5:-4])] + parsed[-4:]
+        if len(repaired) == expected_columns:
+            return repaired, None
+        return None, f"could not merge {len(parsed)} fields"
+    return None, f"{len(parsed)} fields, expected {expected_columns}"
+
+
+def clean_chunk(rows):
+    df = pd.DataFrame(rows, columns=columns)
+
+    # Convert numeric columns
+    for col in ["Age", "Rating", "Potential", "Value"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+
+    # Fix repeated prefix in all relevant URL columns
+    for col in ["Player URL", "Team Link"]:
         df[col] = df[col].str.replace(f"{prefix}{prefix}", prefix, regex=False)
+    return df
+
+
+# 🚰 Stream SOURCE_CSV in CHUNK_ROWS slices: bounded memory whatever the file size
+def stream_repair(source=SOURCE_CSV, output=OUTPUT_CSV, quarantine=QUARANTINE_CSV, chunk_rows=CHUNK_ROWS):
+    start = time.time()
+    line_number = 0
+    written = 0
+    quarantined = 0
+
+    with open(source, "r", encoding="utf-8") as f, open(
+        quarantine, "w", encoding="utf-8", newline=""
+    ) as q:
+        quarantine_writer = csv.writer(q)
+        quarantine_writer.writerow(["line", "reason", "raw"])
+
+        while chunk := list(itertools.islice(f, chunk_rows)):
+            rows = []
+            for raw in chunk:
+                line_number += 1
+                if not raw.strip():
+                    continue
+                fields, reason = repair_line(raw)
+                if fields is None:
+                    quarantine_writer.writerow([line_number, reason, raw.rstrip("\r\n")])
+                    quarantined += 1
+                else:
+                    rows.append(fields)
+
+            df = clean_chunk(rows)
+            df.index = range(written, written + len(df))
+            df.to_csv(output, mode="a" if written else "w", header=not written)
+            written += len(df)
+
+            elapsed = time.time() - start
+            print(f"… {line_number} lines, {line_number / elapsed:,.0f} rows/s")
+
+    elapsed = time.time() - start
+    print(
+        f"✅ {written} rows → {output}, {quarantined} quarantined → {quarantine} "
+        f"({line_number} lines in {elapsed:.1f}s, {line_number / max(elapsed, 1e-9):,.0f} rows/s)"
+    )
+    return written, quarantined
+
 
-df.to_csv("all_players_ratings_original.csv")
+if __name__ == "__main__":
+    # python clean_football_transfer_csv.py [source] [output]
+    source = sys.argv[1] if len(sys.argv) > 1 else SOURCE_CSV
+    output = sys.argv[2] if len(sys.argv) > 2 else OUTPUT_CSV
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Missing CSV file at: {source}")
+    stream_repair(source, output)
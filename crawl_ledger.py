@@ -0,0 +1,168 @@
+import os
+import socket
+import sqlite3
+import sys
+import time
+
+# Settings
+LEDGER_PATH = "fbref_jobs.sqlite"
+LEASE_SECONDS = 30 * 60  # A running job not finished within this is handed out again
+MAX_ATTEMPTS = 5  # After this many failures a job stays in the failed queue
+RETRY_BACKOFF_SECONDS = 60  # A failed job waits this long before it can be claimed again, doubling per attempt
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class CrawlLedger:
+    def __init__(self, path=LEDGER_PATH):
+        # isolation_level=None: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                url TEXT PRIMARY KEY,
+                player_name TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                claimed_by TEXT,
+                claimed_at REAL,
+                not_before REAL,
+                revalidate INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        if "not_before" not in columns:  # Ledgers created before the retry back-off
+            self._db.execute("ALTER TABLE jobs ADD COLUMN not_before REAL")
+        if "revalidate" not in columns:  # ...and before requeued jobs bypassed the page cache
+            self._db.execute("ALTER TABLE jobs ADD COLUMN revalidate INTEGER NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+        # Shared request pacing for every worker process on this ledger
+        self._db.execute("CREATE TABLE IF NOT EXISTS pacing (name TEXT PRIMARY KEY, next_at REAL NOT NULL)")
+
+    def close(self):
+        self._db.close()
+
+    # ➕ Register URLs; known URLs keep their status
+    def seed(self, jobs):
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        cursor = self._db.executemany(
+            "INSERT OR IGNORE INTO jobs (url, player_name, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            [(url, name, now, now) for url, name in jobs],
+        )
+        self._db.execute("COMMIT")
+        return cursor.rowcount
+
+    # 🔒 Atomically hand one job to this worker (safe across processes)
+    def claim(self, worker=None, queue=PENDING):
+        worker = worker or worker_name()
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            # Reclaim jobs whose worker died mid-crawl
+            self._db.execute(
+                "UPDATE jobs SET status = ?, claimed_by = NULL WHERE status = ? AND claimed_at < ?",
+                (PENDING, RUNNING, now - LEASE_SECONDS),
+            )
+            row = self._db.execute(
+                "UPDATE jobs SET status = ?, claimed_by = ?, claimed_at = ?, "
+                "attempts = attempts + 1, updated_at = ? "
+                "WHERE rowid = (SELECT rowid FROM jobs WHERE status = ? "
+                "AND attempts < ? AND (not_before IS NULL OR not_before <= ?) ORDER BY rowid LIMIT 1) "
+                "RETURNING url, player_name, attempts, revalidate",
+                (RUNNING, worker, now, now, queue, MAX_ATTEMPTS, now),
+            ).fetchone()
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return row
+
+    def complete_many(self, urls):
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        self._db.executemany(
+            "UPDATE jobs SET status = ?, last_error = NULL, claimed_by = NULL, revalidate = 0, "
+            "updated_at = ? WHERE url = ?",
+            [(DONE, now, url) for url in urls],
+        )
+        self._db.execute("COMMIT")
+
+    # Back off exponentially, so draining the failed queue does not hit the same URL back-to-back
+    def fail(self, url, error):
+        now = time.time()
+        self._db.execute(
+            "UPDATE jobs SET status = ?, last_error = ?, claimed_by = NULL, updated_at = ?, "
+            "not_before = ? * (1 << MAX(attempts - 1, 0)) + ? WHERE url = ?",
+            (FAILED, str(error)[:1000], now, RETRY_BACKOFF_SECONDS, now, url),
+        )
+
+    # 🔁 Move failed jobs back into the pending queue
+    def retry_failed(self, reset_attempts=False):
+        attempts = ", attempts = 0, not_before = NULL" if reset_attempts else ""
+        cursor = self._db.execute(
+            f"UPDATE jobs SET status = ?, updated_at = ?{attempts} WHERE status = ?",
+            (PENDING, time.time(), FAILED),
+        )
+        return cursor.rowcount
+
+    # Force specific URLs to be crawled again (e.g. after an upstream change), past the page cache
+    def requeue(self, urls):
+        now = time.time()
+        cursor = self._db.executemany(
+            "UPDATE jobs SET status = ?, attempts = 0, not_before = NULL, revalidate = 1, updated_at = ? "
+            "WHERE url = ?",
+            [(PENDING, now, url) for url in urls],
+        )
+        return cursor.rowcount
+
+    # ⏳ Called after each request: queues this worker behind the others' slots, one per interval
+    # Returns the seconds to sleep before this worker's next request
+    def pace(self, interval, name="default"):
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute("SELECT next_at FROM pacing WHERE name = ?", (name,)).fetchone()
+            slot = max(now, row[0]) if row else now
+            self._db.execute(
+                "INSERT INTO pacing VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET next_at = excluded.next_at",
+                (name, slot + interval),
+            )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return slot + interval - now
+
+    def counts(self):
+        return dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+
+    def failures(self, limit=20):
+        return self._db.execute(
+            "SELECT url, player_name, attempts, last_error FROM jobs "
+            "WHERE status = ? ORDER BY updated_at DESC LIMIT ?",
+            (FAILED, limit),
+        ).fetchall()
+
+
+if __name__ == "__main__":
+    # python crawl_ledger.py [status | retry-failed]
+    ledger = CrawlLedger()
+    if len(sys.argv) > 1 and sys.argv[1] == "retry-failed":
+        print(f"🔁 {ledger.retry_failed(reset_attempts=True)} failed jobs re-queued")
+    print(f"📊 {ledger.counts()}")
+    for url, name, attempts, error in ledger.failures():
+        print(f"❌ {name} ({attempts} attempts): {error} → {url}")
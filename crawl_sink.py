@@ -0,0 +1,139 @@
+import csv
+import json
+import os
+import queue
+import threading
+import time
+
+import metrics
+
+# Settings
+BATCH_PAGES = 20  # Pages per checkpoint
+FLUSH_SECONDS = 5  # Checkpoint at least this often while pages are waiting
+QUEUE_PAGES = 64  # Producers block when the writer falls this far behind
+
+
+def _fsync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+# ✍️ The only thread that touches the data file and the page logs
+class PageSink(threading.Thread):
+    def __init__(
+        self,
+        data_file,
+        columns,
+        scraped_log,
+        failed_log,
+        batch_pages=BATCH_PAGES,
+        flush_seconds=FLUSH_SECONDS,
+    ):
+        super().__init__(daemon=True)
+        self.data_file = data_file
+        self.columns = columns
+        self.scraped_log = scraped_log
+        self.failed_log = failed_log
+        self.checkpoint_file = data_file + ".checkpoint"
+        self.batch_pages = batch_pages
+        self.flush_seconds = flush_seconds
+        self.queue = queue.Queue(maxsize=QUEUE_PAGES)
+        self.rows_written = 0
+        self.pages_written = 0
+        self._error = None
+
+    def start(self):
+        self._recover()
+        super().start()
+
+    # Producer side
+    def put_page(self, page, records):
+        self.queue.put(("page", page, records))
+        metrics.QUEUE_DEPTH.set(self.queue.qsize(), queue="page_sink")
+
+    def put_failed(self, page):
+        self.queue.put(("failed", page, None))
+
+    def close(self):
+        self.queue.put(None)
+        self.join()
+        if self._error:
+            raise self._error
+
+    # 🔁 Undo whatever a crash left after the last checkpoint
+    def _recover(self):
+        if not os.path.exists(self.checkpoint_file):
+            return
+        with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if os.path.exists(self.data_file) and os.path.getsize(self.data_file) > checkpoint["offset"]:
+            with open(self.data_file, "r+b") as f:
+                f.truncate(checkpoint["offset"])
+        # The page log may have missed the last batch; it is a set, re-adding is harmless
+        with open(self.scraped_log, "a") as f:
+            f.writelines(f"{page}\n" for page in checkpoint["pages"])
+            _fsync(f)
+
+    def _checkpoint(self, data, pages, failed):
+        metrics.QUEUE_DEPTH.set(self.queue.qsize(), queue="page_sink")
+        if pages:
+            start = time.perf_counter()
+            data_writer = csv.DictWriter(data, fieldnames=self.columns)
+            if os.fstat(data.fileno()).st_size == 0:
+                data_writer.writeheader()
+            for _, records in pages:
+                data_writer.writerows(records)
+            _fsync(data)
+
+            # Rows are durable: record the offset, then mark the pages done
+            tmp_path = self.checkpoint_file + ".tmp"
+            offset = os.fstat(data.fileno()).st_size
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"offset": offset, "pages": [page for page, _ in pages]}, f)
+                _fsync(f)
+            os.replace(tmp_path, self.checkpoint_file)
+
+            with open(self.scraped_log, "a") as f:
+                f.writelines(f"{page}\n" for page, _ in pages)
+                _fsync(f)
+
+            rows = sum(len(records) for _, records in pages)
+            self.rows_written += rows
+            self.pages_written += len(pages)
+            metrics.WRITE_SECONDS.observe(time.perf_counter() - start, sink="page_sink")
+            metrics.WRITTEN_ROWS.inc(rows, sink="page_sink")
+            for page, records in pages:
+                print(f"✅ Saved page {page} with {len(records)} players")
+
+        if failed:
+            with open(self.failed_log, "a") as f:
+                f.writelines(f"{page}\n" for page in failed)
+                _fsync(f)
+        pages.clear()
+        failed.clear()
+
+    def run(self):
+        try:
+            pages, failed = [], []
+            with open(self.data_file, "a", encoding="utf-8", newline="") as data:
+                while True:
+                    try:
+                        item = self.queue.get(timeout=self.flush_seconds)
+                    except queue.Empty:
+                        self._checkpoint(data, pages, failed)
+                        continue
+                    if item is None:
+                        break
+                    kind, page, records = item
+                    if kind == "page":
+                        pages.append((page, records))
+                    else:
+                        failed.append(page)
+                    if len(pages) + len(failed) >= self.batch_pages:
+                        self._checkpoint(data, pages, failed)
+                self._checkpoint(data, pages, failed)
+        except Exception as e:
+            self._error = e
+            # Keep draining so producers never block on a dead writer
+            while self.queue.get() is not None:
+                pass
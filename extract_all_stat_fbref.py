@@ -1,139 +1,148 @@
-import asyncio
+import argparse
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-import nest_asyncio
 import pandas as pd
-from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
-from tqdm import tqdm
+import requests
 
-nest_asyncio.apply()
+import metrics
+from crawl_ledger import FAILED, LEASE_SECONDS, PENDING, CrawlLedger
+from fbref_store import FbrefStore, stored_player_ids
+from fbref_tables import REQUEST_DELAY_SECONDS, extract_tables, fetch_html, write_tables
 
 # Settings
-BASE_URL = "https://fbref.com"
-CHROMIUM_PATH = (
-    r"C:/Users/L1160681/playwright-browsers/chromium-win64/chrome-win/chrome.exe"
-)
 CSV_PATH = r"C:/Users/L1160681/OneDrive - TotalEnergies/Documents/Projet/SP/all_players_ratings_original_updated.csv"
 ROOT_FOLDER = "all_players_fbref_tables"
-
-os.makedirs(ROOT_FOLDER, exist_ok=True)
-
-# Load player data
-df = pd.read_csv(CSV_PATH)
-df = df.dropna(subset=["fbref_alltimestat", "Name"])
-df = df[df["fbref_alltimestat"].str.startswith("https://fbref.com")]
-
-# Count existing folders to resume scraping
-total_number = len(
-    [
-        name
-        for name in os.listdir(ROOT_FOLDER)
-        if os.path.isdir(os.path.join(ROOT_FOLDER, name))
-    ]
-)
-
-print(f"Found {total_number} existing player folders. Resuming from there...")
-
-
-async def scrape_all_fbref_tables(context, url: str, player_name: str):
-    try:
-        player_id = url.split("/")[5]
-        SAVE_FOLDER = f"{player_name}_{player_id}"
-        folder_path = os.path.join(ROOT_FOLDER, SAVE_FOLDER)
-
-        # Skip if folder exists and contains .csv files
-        if os.path.exists(folder_path) and any(
-            fname.endswith(".csv") for fname in os.listdir(folder_path)
-        ):
-            print(f"Skipping {player_name} ({player_id}) — folder already populated.")
-            return
-
-        os.makedirs(folder_path, exist_ok=True)
-
-        tab = await context.new_page()
-        await tab.goto(url, timeout=60000)
-
-        await tab.evaluate("""
-            document.querySelectorAll('a.sr_preset').forEach(el => el.click());
-        """)
-
-        html = await tab.content()
-        await tab.close()
-
-        soup = BeautifulSoup(html, "html.parser")
-        tables = soup.find_all("table")
-
-        print(f"Found {len(tables)} tables on tab for {player_name}")
-        table_ids = [table.get("id") for table in tables if table.get("id")]
-        print(f"{player_name} ({player_id}) - Table IDs: {table_ids}")
-
-        for table in tables:
-            table_id = table.get("id", None)
-            if not table_id:
-                continue
-
-            header_row = (
-                table.find("thead").find_all("tr")[-1] if table.find("thead") else None
-            )
-            headers = (
-                [th.get_text(strip=True) for th in header_row.find_all("th")]
-                if header_row
-                else []
-            )
-
-            rows = []
-            for tr in table.find("tbody").find_all("tr"):
-                row = []
-                for cell in tr.find_all(["th", "td"]):
-                    text = cell.get_text(strip=True)
-                    link = cell.find("a")
-                    if link and link.get("href"):
-                        text += f" ({BASE_URL}{link.get('href')})"
-                    row.append(text)
-                if len(row) == len(headers):
-                    rows.append(row)
-
-            if rows:
-                df_table = pd.DataFrame(rows, columns=headers)
-                output_path = os.path.join(folder_path, f"{table_id}.csv")
-                df_table.to_csv(output_path, index=False)
-
-    except Exception as e:
-        print(f"Error scraping {player_name}: {e}")
-
-
-async def main():
-    async with async_playwright() as playwright:
-        browser = await playwright.chromium.launch(
-            executable_path=CHROMIUM_PATH, headless=True
+STORE_FORMAT = "parquet"  # "parquet" (fbref_store dataset) or "csv" (one folder per player)
+CHECKPOINT_EVERY = 50  # Players buffered before the store is flushed and jobs marked done...
+CHECKPOINT_SECONDS = LEASE_SECONDS / 6  # ...or after this long, so a paced worker never outlives its leases
+WORKERS = 1
+
+
+# 📋 Register every fbref_alltimestat URL in the job ledger
+def seed_ledger(ledger):
+    df = pd.read_csv(CSV_PATH)
+    df = df.dropna(subset=["fbref_alltimestat", "Name"])
+    df = df[df["fbref_alltimestat"].str.startswith("https://fbref.com")]
+
+    first_run = not ledger.counts()
+    added = ledger.seed(zip(df["fbref_alltimestat"], df["Name"]))
+
+    if first_run:
+        # Players scraped before the ledger existed are already done
+        if STORE_FORMAT == "parquet":
+            stored = stored_player_ids()
+        else:
+            stored = {
+                name.rpartition("_")[2]
+                for name in os.listdir(ROOT_FOLDER)
+                if os.path.isdir(os.path.join(ROOT_FOLDER, name))
+            }
+        ledger.complete_many(
+            url for url in df["fbref_alltimestat"] if url.split("/")[5] in stored
         )
+    print(f"Ledger seeded with {added} new players: {ledger.counts()}")
 
-        # Create a single browser context (i.e. one window)
-        context = await browser.new_context()
 
-        rows_to_scrape = df[total_number - 50 :]
-        batch_size = len(rows_to_scrape)
-
-        for batch_start in tqdm(
-            range(0, len(rows_to_scrape), batch_size),
-            desc="Scraping batches of players",
-        ):
-            batch = rows_to_scrape.iloc[batch_start : batch_start + batch_size]
-            tasks = []
-
-            for i, (_, row) in enumerate(batch.iterrows()):
-                url = row["fbref_alltimestat"]
-                name = row["Name"]
-
-                await asyncio.sleep(6)  # Delay between tab openings
-                task = asyncio.create_task(scrape_all_fbref_tables(context, url, name))
-                tasks.append(task)
-
-            await asyncio.gather(*tasks)
-
-        await browser.close()
+# 🔁 Send players back to the pending queue, by footballtransfers URL
+def requeue_players(player_urls):
+    df = pd.read_csv(CSV_PATH, usecols=["Player URL", "fbref_alltimestat"])
+    urls = df.loc[df["Player URL"].isin(set(player_urls)), "fbref_alltimestat"].dropna()
+    ledger = CrawlLedger()
+    try:
+        requeued = ledger.requeue(urls.tolist())
+    finally:
+        ledger.close()
+    print(f"🔁 {requeued} fbref jobs re-queued past the page cache; the next crawl re-rates only those players")
+    return requeued
+
+
+# Plain HTTP: fbref's hidden tables are already in the static response as comments
+# ttl=0 revalidates instead of trusting a cached copy (requeued players)
+def scrape_all_fbref_tables(session, store, url: str, player_name: str, ttl=None):
+    player_id = url.split("/")[5]
+    response = fetch_html(url, session, ttl=ttl)
+    tables = extract_tables(response.text)
+
+    print(f"{player_name} ({player_id}) - Table IDs: {list(tables)}")
+    if STORE_FORMAT == "parquet":
+        store.add(player_id, player_name, tables)
+    else:
+        write_tables(tables, os.path.join(ROOT_FOLDER, f"{player_name}_{player_id}"))
+    return not response.from_cache
+
+
+# 🧑‍🏭 Claim jobs until the queue is empty
+def run_worker(queue=PENDING):
+    metrics.start_exporter(f"extract_all_stat_fbref-{os.getpid()}")  # One file per worker process
+    ledger = CrawlLedger()
+    finished = []
+    last_checkpoint = time.monotonic()
+
+    def checkpoint():
+        nonlocal last_checkpoint
+        # Jobs are only marked done once their rows are on disk
+        store.flush()
+        ledger.complete_many(finished)
+        finished.clear()
+        last_checkpoint = time.monotonic()
+
+    with requests.Session() as session:
+        store = FbrefStore(flush_every=sys.maxsize)
+        try:
+            while (job := ledger.claim(queue=queue)) is not None:
+                url, player_name, attempt, revalidate = job
+                try:
+                    ttl = 0 if revalidate else None
+                    hit_network = scrape_all_fbref_tables(session, store, url, player_name, ttl)
+                    finished.append(url)
+                except Exception as e:
+                    print(f"Error scraping {player_name} (attempt {attempt}): {e}")
+                    ledger.fail(url, e)
+                    hit_network = True
+
+                if len(finished) >= CHECKPOINT_EVERY or (
+                    finished and time.monotonic() - last_checkpoint >= CHECKPOINT_SECONDS
+                ):
+                    checkpoint()
+                if hit_network:
+                    # One request per REQUEST_DELAY_SECONDS across all workers, not per worker
+                    time.sleep(ledger.pace(REQUEST_DELAY_SECONDS, "fbref"))
+        finally:
+            checkpoint()
+            ledger.close()
+            if STORE_FORMAT == "parquet":
+                print(f"🧾 {store.unchanged} tables unchanged since the last crawl were not rewritten")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl fbref all-competition tables")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument(
+        "--retry-failed", action="store_true", help="drain the failed queue instead"
+    )
+    args = parser.parse_args()
+
+    os.makedirs(ROOT_FOLDER, exist_ok=True)
+    ledger = CrawlLedger()
+    seed_ledger(ledger)
+    ledger.close()
+
+    queue = FAILED if args.retry_failed else PENDING
+    if args.workers == 1:
+        run_worker(queue)
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            for future in [executor.submit(run_worker, queue) for _ in range(args.workers)]:
+                future.result()
+
+    ledger = CrawlLedger()
+    print(f"📊 Ledger: {ledger.counts()}")
+    ledger.close()
 
 
 # Run the scraper
-asyncio.run(main())
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import os
+import re
+import time
+from datetime import datetime
+
+import pandas as pd
+import requests
+from tqdm import tqdm
+
+from fbref_tables import BASE_URL, REQUEST_DELAY_SECONDS, fetch_html, iter_tables
+from name_index import normalize_name
+from resolution_journal import ResolutionJournal, compact, load_journal
+
+# Settings
+RATINGS_CSV = "all_players_ratings.csv"
+JOURNAL_PATH = "fbref_url_journal.csv"  # Same journal as fbref_extraction_v.1.py
+INDEX_CSV = "fbref_player_index.csv"
+SEASONS = [None]  # None = current season; add e.g. "2023-2024" to reach older squads
+COMPETITIONS = [
+    ("Big5", "Big-5-European-Leagues"),
+    ("10", "Championship"),
+    ("17", "La-Liga-2"),
+    ("18", "Serie-B"),
+    ("60", "Ligue-2"),
+    ("33", "2-Bundesliga"),
+    ("23", "Eredivisie"),
+    ("32", "Primeira-Liga"),
+    ("37", "Belgian-Pro-League"),
+    ("26", "Super-Lig"),
+    ("40", "Scottish-Premiership"),
+    ("24", "Serie-A"),
+    ("21", "Liga-Profesional-Argentina"),
+    ("31", "Liga-MX"),
+    ("22", "Major-League-Soccer"),
+    ("70", "Saudi-Pro-League"),
+]
+SQUAD_URLS = []  # Extra /en/squads/<id>/... pages for clubs outside COMPETITIONS
+
+PLAYER_LINK_RE = re.compile(r"^/en/players/([0-9a-f]{8})/")
+CLUB_STOPWORDS = {"fc", "cf", "afc", "sc", "ac", "club", "de", "cd", "ud", "sv", "fk", "sk"}
+
+
+def competition_url(comp_id, slug, season=None):
+    if comp_id == "Big5":
+        base = f"{BASE_URL}/en/comps/Big5"
+        season_path = f"/{season}" if season else ""
+        prefix = f"{season}-" if season else ""
+        return f"{base}{season_path}/stats/players/{prefix}{slug}-Stats"
+    if season:
+        return f"{BASE_URL}/en/comps/{comp_id}/{season}/stats/{season}-{slug}-Stats"
+    return f"{BASE_URL}/en/comps/{comp_id}/stats/{slug}-Stats"
+
+
+def _cell(tr, stat):
+    cell = tr.find(attrs={"data-stat": stat})
+    return cell.get_text(strip=True) if cell else None
+
+
+# 📋 Every player row (any table) on a competition or squad stats page
+def parse_player_rows(html, source_url):
+    page_club = None
+    rows = []
+    for _, table in iter_tables(html):
+        for tr in table.find_all("tr"):
+            player_cell = tr.find(attrs={"data-stat": "player"})
+            link = player_cell.find("a") if player_cell else None
+            found = PLAYER_LINK_RE.match(link.get("href", "")) if link else None
+            if not found:
+                continue
+
+            if page_club is None and "/en/squads/" in source_url:
+                # Squad pages have no squad column: "2024-2025 Arsenal Stats" → "Arsenal"
+                heading = re.search(r"<h1[^>]*>(.*?)</h1>", html, re.S)
+                title = re.sub(r"<[^>]+>", "", heading.group(1)) if heading else ""
+                page_club = re.sub(r"^\s*\d{4}(-\d{4})?\s+|\s+Stats.*$", "", title.strip())
+
+            born = _cell(tr, "birth_year")
+            rows.append(
+                {
+                    "fbref_id": found.group(1),
+                    "name": link.get_text(strip=True),
+                    "club": _cell(tr, "team") or page_club,
+                    "birth_year": int(born) if born and born.isdigit() else None,
+                    "position": _cell(tr, "position"),
+                    "fbref_url": BASE_URL + link["href"],
+                }
+            )
+    return rows
+
+
+# 🕸️ Crawl competition/squad pages into the local index
+def build_index(seasons=SEASONS, index_csv=INDEX_CSV):
+    urls = [
+        competition_url(comp_id, slug, season)
+        for season in seasons
+        for comp_id, slug in COMPETITIONS
+    ] + SQUAD_URLS
+
+    rows = []
+    with requests.Session() as session:
+        for url in tqdm(urls, desc="Crawling fbref competition pages"):
+            try:
+                response = fetch_html(url, session)
+                rows.extend(parse_player_rows(response.text, url))
+                if not response.from_cache:
+                    time.sleep(REQUEST_DELAY_SECONDS)
+            except Exception as e:
+                print(f"Error on {url}: {e}")
+
+    index = pd.DataFrame(rows, columns=["fbref_id", "name", "club", "birth_year", "position", "fbref_url"])
+    index = index.drop_duplicates(subset=["fbref_id", "club"]).reset_index(drop=True)
+    index.to_csv(index_csv, index=False)
+    print(f"✅ Indexed {index['fbref_id'].nunique()} players from {len(urls)} pages → {index_csv}")
+    return index
+
+
+def club_tokens(club):
+    return {t for t in re.split(r"[^a-z0-9]+", normalize_name(club)) if t and t not in CLUB_STOPWORDS}
+
+
+def clubs_match(a, b):
+    tokens_a, tokens_b = club_tokens(a), club_tokens(b)
+    return any(
+        x == y or (len(x) >= 3 and y.startswith(x)) or (len(y) >= 3 and x.startswith(y))
+        for x in tokens_a
+        for y in tokens_b
+    )
+
+
+def token_key(name):
+    return " ".join(sorted(normalize_name(name).split()))
+
+
+# 🧩 Offline matching of the ratings table against the index
+def match_players(players, index, year=None):
+    year = year or datetime.now().year
+    by_name, by_tokens = {}, {}
+    for candidate in index.to_dict("records"):
+        by_name.setdefault(normalize_name(candidate["name"]), []).append(candidate)
+        by_tokens.setdefault(token_key(candidate["name"]), []).append(candidate)
+
+    matches = {}
+    for i, row in players.iterrows():
+        candidates = by_name.get(normalize_name(row["Name"])) or by_tokens.get(
+            token_key(row["Name"]), []
+        )
+        if pd.notna(row.get("Age")):
+            birth_year = year - int(row["Age"])
+            candidates = [
+                c
+                for c in candidates
+                if pd.isna(c["birth_year"]) or abs(c["birth_year"] - birth_year) <= 1
+            ]
+
+        ids = {c["fbref_id"] for c in candidates}
+        if len(ids) > 1:
+            # Same name, same age bracket: the club decides
+            candidates = [c for c in candidates if clubs_match(c["club"], row["Team"])]
+            ids = {c["fbref_id"] for c in candidates}
+        if len(ids) == 1:
+            matches[i] = candidates[0]["fbref_url"]
+    return matches
+
+
+def match_ratings(ratings_csv=RATINGS_CSV, index_csv=INDEX_CSV):
+    players = pd.read_csv(ratings_csv)
+    if "fbref_url" not in players.columns:
+        players["fbref_url"] = None
+    already = load_journal(JOURNAL_PATH)
+    missing = players[players["fbref_url"].isna() & ~players["Player URL"].isin(already)]
+    index = pd.read_csv(index_csv)
+
+    start = time.time()
+    matches = match_players(missing, index)
+    with ResolutionJournal(JOURNAL_PATH) as journal:
+        for i, fbref_url in matches.items():
+            journal.append(missing.at[i, "Player URL"], fbref_url)
+    merged = compact(ratings_csv, JOURNAL_PATH)
+
+    print(
+        f"✅ Matched {len(matches)}/{len(missing)} players offline in "
+        f"{time.time() - start:.2f}s ({merged} URLs merged into {ratings_csv}); "
+        f"{len(missing) - len(matches)} left for the search resolvers"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk fbref ID discovery")
+    parser.add_argument("stage", choices=["crawl", "match", "all"])
+    args = parser.parse_args()
+
+    if args.stage in ("crawl", "all") or not os.path.exists(INDEX_CSV):
+        build_index()
+    if args.stage in ("match", "all"):
+        match_ratings()
@@ -0,0 +1,295 @@
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import metrics
+
+# Settings
+STORE_ROOT = "fbref_store"  # Parquet dataset, one hive partition per table_id
+LEGACY_ROOT = "all_players_fbref_tables"  # {name}_{id}/{table_id}.csv tree
+FLUSH_EVERY_PLAYERS = 200  # Players buffered in memory before a part file is written
+MANIFEST_NAME = "manifest.sqlite"  # Content hash per (player_id, table_id), next to the partitions
+
+LINK_SUFFIX_RE = re.compile(r"\s*\(https?://[^)]*\)$")
+
+
+# Same renaming pandas.read_csv applies to repeated headers (Gls, Gls.1, ...)
+def dedupe_columns(columns):
+    seen = {}
+    result = []
+    for column in columns:
+        column = str(column)
+        if column in seen:
+            seen[column] += 1
+            result.append(f"{column}.{seen[column]}")
+        else:
+            seen[column] = 0
+            result.append(column)
+    return result
+
+
+def strip_link(value):
+    return LINK_SUFFIX_RE.sub("", value) if isinstance(value, str) else value
+
+
+def _prepare(df_table, player_id, player_name, scraped_at):
+    df_table = df_table.copy()
+    df_table.columns = dedupe_columns(df_table.columns)
+    df_table = df_table.astype("string")
+
+    df_table.insert(0, "player_id", player_id)
+    df_table.insert(1, "player_name", player_name)
+    season = df_table["Season"].map(strip_link) if "Season" in df_table.columns else None
+    df_table.insert(2, "season", season)
+    df_table.insert(3, "scraped_at", scraped_at)
+    return df_table.astype({"player_id": "string", "player_name": "string", "season": "string"})
+
+
+def _partition_path(root, table_id):
+    return os.path.join(root, f"table_id={table_id}")
+
+
+# Hash of the table as scraped, before the store adds scraped_at
+# Canonical form (read_csv header names, string cells) so a scraped table and its legacy CSV hash the same
+def content_hash(df_table):
+    canonical = df_table.set_axis(dedupe_columns(df_table.columns), axis=1).astype("string")
+    return hashlib.sha256(canonical.to_csv(index=False).encode("utf-8")).hexdigest()
+
+
+# 🧾 Which (player_id, table_id) changed, numbered by a store-wide version counter
+class TableManifest:
+    def __init__(self, root=STORE_ROOT):
+        os.makedirs(root, exist_ok=True)
+        # isolation_level=None: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(
+            os.path.join(root, MANIFEST_NAME), timeout=60, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS hashes (
+                player_id TEXT NOT NULL,
+                table_id TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                changed_at REAL NOT NULL,
+                PRIMARY KEY (player_id, table_id)
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS hashes_version ON hashes (version)")
+
+    def close(self):
+        self._db.close()
+
+    def hashes(self, player_id):
+        rows = self._db.execute(
+            "SELECT table_id, hash FROM hashes WHERE player_id = ?", (player_id,)
+        )
+        return dict(rows.fetchall())
+
+    def version(self):
+        return self._db.execute("SELECT COALESCE(MAX(version), 0) FROM hashes").fetchone()[0]
+
+    # 💾 Record new hashes under one new version; unchanged entries keep theirs
+    def record(self, entries):
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            version = self.version() + 1
+            self._db.executemany(
+                "INSERT INTO hashes (player_id, table_id, hash, version, changed_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (player_id, table_id) DO UPDATE SET "
+                "hash = excluded.hash, version = excluded.version, changed_at = excluded.changed_at "
+                "WHERE hash != excluded.hash",
+                [(player_id, table_id, h, version, now) for player_id, table_id, h in entries],
+            )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return version
+
+    # 🔍 Players with at least one of table_ids changed after version
+    def changed_since(self, version, table_ids=None):
+        query = "SELECT DISTINCT player_id FROM hashes WHERE version > ?"
+        params = [version]
+        if table_ids is not None:
+            table_ids = list(table_ids)
+            query += f" AND table_id IN ({', '.join('?' * len(table_ids))})"
+            params += table_ids
+        return {row[0] for row in self._db.execute(query, params)}
+
+
+class FbrefStore:
+    def __init__(self, root=STORE_ROOT, flush_every=FLUSH_EVERY_PLAYERS):
+        self.root = root
+        self.flush_every = flush_every
+        self.manifest = TableManifest(root)
+        self.unchanged = 0
+        self._pending = {}
+        self._pending_hashes = []
+        self._pending_players = 0
+        os.makedirs(root, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    # ➕ Buffer one player's {table_id: DataFrame}; tables identical to the stored ones are skipped
+    def add(self, player_id, player_name, tables, scraped_at=None):
+        scraped_at = scraped_at if scraped_at is not None else time.time()
+        stored = self.manifest.hashes(player_id)
+        for table_id, df_table in tables.items():
+            table_hash = content_hash(df_table)
+            if stored.get(table_id) == table_hash:
+                self.unchanged += 1
+                continue
+            self._pending_hashes.append((player_id, table_id, table_hash))
+            self._pending.setdefault(table_id, []).append(
+                _prepare(df_table, player_id, player_name, scraped_at)
+            )
+        self._pending_players += 1
+        if self._pending_players >= self.flush_every:
+            self.flush()
+
+    # 💾 One new part file per touched partition; existing files are never rewritten
+    def flush(self):
+        start = time.perf_counter()
+        rows = 0
+        for table_id, frames in self._pending.items():
+            folder = _partition_path(self.root, table_id)
+            os.makedirs(folder, exist_ok=True)
+            name = f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet"
+            tmp_path = os.path.join(folder, f".{name}.tmp")
+            table = pa.Table.from_pandas(
+                pd.concat(frames, ignore_index=True), preserve_index=False
+            )
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, os.path.join(folder, name))
+            rows += table.num_rows
+        # Hashes only once the rows they describe are on disk
+        if self._pending_hashes:
+            self.manifest.record(self._pending_hashes)
+        if rows:
+            metrics.WRITE_SECONDS.observe(time.perf_counter() - start, sink="fbref_store")
+            metrics.WRITTEN_ROWS.inc(rows, sink="fbref_store")
+        self._pending = {}
+        self._pending_hashes = []
+        self._pending_players = 0
+
+
+def table_ids(root=STORE_ROOT):
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name.split("=", 1)[1] for name in os.listdir(root) if name.startswith("table_id=")
+    )
+
+
+def _partition_dataset(root, table_id):
+    folder = _partition_path(root, table_id)
+    if not os.path.isdir(folder):
+        return None
+    dataset = ds.dataset(folder, format="parquet", exclude_invalid_files=True)
+    fragments = list(dataset.get_fragments())
+    if not fragments:
+        return None
+    # Part files written at different times may carry different header sets
+    schema = pa.unify_schemas([fragment.physical_schema for fragment in fragments])
+    return ds.dataset(folder, schema=schema, format="parquet")
+
+
+# 📖 All rows of one table for every (or some) player in a single scan
+def read_table(table_id, columns=None, player_ids=None, root=STORE_ROOT, latest_only=True):
+    dataset = _partition_dataset(root, table_id)
+    if dataset is None:
+        return pd.DataFrame()
+
+    if columns is not None:
+        columns = list(dict.fromkeys(["player_id", "scraped_at", *columns]))
+        columns = [c for c in columns if c in dataset.schema.names]
+    row_filter = (
+        ds.field("player_id").isin(list(player_ids)) if player_ids is not None else None
+    )
+    df = dataset.to_table(columns=columns, filter=row_filter).to_pandas()
+
+    if latest_only and not df.empty:
+        # A re-scraped player has several versions; keep the newest one
+        latest = df.groupby("player_id")["scraped_at"].transform("max")
+        df = df[df["scraped_at"] == latest].reset_index(drop=True)
+    return df
+
+
+def stored_player_ids(root=STORE_ROOT):
+    player_ids = set()
+    for table_id in table_ids(root):
+        dataset = _partition_dataset(root, table_id)
+        if dataset is not None:
+            column = dataset.to_table(columns=["player_id"]).column("player_id")
+            player_ids.update(column.unique().to_pylist())
+    return player_ids
+
+
+# 🧹 Rewrite a partition as one file holding only the latest version per player
+def compact(table_id, root=STORE_ROOT):
+    df = read_table(table_id, root=root)
+    if df.empty:
+        return 0
+    folder = _partition_path(root, table_id)
+    old_files = [f for f in os.listdir(folder) if f.endswith(".parquet")]
+
+    name = f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet"
+    tmp_path = os.path.join(folder, f".{name}.tmp")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+    os.replace(tmp_path, os.path.join(folder, name))
+    for old in old_files:
+        os.remove(os.path.join(folder, old))
+    return len(df)
+
+
+# 🚚 One-shot migration of the legacy folder tree
+def migrate_folder_tree(legacy_root=LEGACY_ROOT, root=STORE_ROOT):
+    migrated = 0
+    with FbrefStore(root) as store:
+        for folder in sorted(os.listdir(legacy_root)):
+            folder_path = os.path.join(legacy_root, folder)
+            player_name, _, player_id = folder.rpartition("_")
+            if not os.path.isdir(folder_path) or not player_id:
+                continue
+
+            tables = {}
+            for fname in os.listdir(folder_path):
+                if fname.endswith(".csv"):
+                    csv_path = os.path.join(folder_path, fname)
+                    tables[fname[:-4]] = pd.read_csv(csv_path, dtype=str)
+            if tables:
+                store.add(player_id, player_name, tables, os.path.getmtime(folder_path))
+                migrated += 1
+
+    for table_id in table_ids(root):
+        compact(table_id, root)
+    return migrated
+
+
+if __name__ == "__main__":
+    # python fbref_store.py [legacy_folder] [store_folder]
+    legacy_root = sys.argv[1] if len(sys.argv) > 1 else LEGACY_ROOT
+    root = sys.argv[2] if len(sys.argv) > 2 else STORE_ROOT
+    if os.path.isdir(root) and table_ids(root):
+        print(f"⚠️ {root} already holds tables; new parts will be appended")
+    start = time.time()
+    count = migrate_folder_tree(legacy_root, root)
+    print(f"✅ Migrated {count} players into {root} in {time.time() - start:.1f}s")
@@ -0,0 +1,102 @@
+import os
+
+import pandas as pd
+from bs4 import BeautifulSoup, Comment
+
+import metrics
+import proxy_pool
+import site_urls
+
+# Settings
+BASE_URL = site_urls.FBREF
+REQUEST_DELAY_SECONDS = 6  # fbref bans clients that go over ~10 requests a minute
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+# 🌐 Plain HTTP fetch through the shared page cache (and the proxy pool, if configured)
+def fetch_html(url, session=None, ttl=None):
+    response = proxy_pool.fetch(url, session=session, headers=HEADERS, timeout=60, ttl=ttl)
+    if response.status_code != 200:
+        raise Exception(f"HTTP {response.status_code} for {url}")
+    return response
+
+
+# 🔎 Every <table id=...> in the live DOM and inside the commented-out blocks
+def iter_tables(html):
+    soup = BeautifulSoup(html, "html.parser")
+    seen = set()
+
+    # fbref ships most secondary tables as <!-- <div><table ...> --> and only
+    # un-comments them client-side, which is what clicking the presets did
+    comment_soups = [
+        BeautifulSoup(comment, "html.parser")
+        for comment in soup.find_all(string=lambda t: isinstance(t, Comment))
+        if "<table" in comment
+    ]
+
+    for source in [soup] + comment_soups:
+        for table in source.find_all("table"):
+            table_id = table.get("id", None)
+            if not table_id or table_id in seen:
+                continue
+            seen.add(table_id)
+            yield table_id, table
+
+
+# 📋 Same header/row walk the Playwright extractors used
+def table_to_frame(table):
+    header_row = table.find("thead").find_all("tr")[-1] if table.find("thead") else None
+    headers = (
+        [th.get_text(strip=True) for th in header_row.find_all("th")]
+        if header_row
+        else []
+    )
+
+    # Without a <tbody>, header and footer rows are skipped like they are with one
+    body = table.find("tbody")
+    if body:
+        body_rows = body.find_all("tr")
+    else:
+        body_rows = [tr for tr in table.find_all("tr") if tr.find_parent(["thead", "tfoot"]) is None]
+
+    rows = []
+    for tr in body_rows:
+        row = []
+        for cell in tr.find_all(["th", "td"]):
+            text = cell.get_text(strip=True)
+            link = cell.find("a")
+            if link and link.get("href"):
+                text += f" ({BASE_URL}{link.get('href')})"
+            row.append(text)
+        if len(row) == len(headers):
+            rows.append(row)
+
+    return pd.DataFrame(rows, columns=headers) if rows else None
+
+
+def extract_tables(html):
+    tables = {}
+    with metrics.PARSE_SECONDS.time(parser="fbref_tables"):
+        for table_id, table in iter_tables(html):
+            df_table = table_to_frame(table)
+            if df_table is not None:
+                tables[table_id] = df_table
+    metrics.PARSED_ROWS.inc(sum(len(t) for t in tables.values()), parser="fbref_tables")
+    return tables
+
+
+# 💾 One {table_id}.csv per table, as before
+def write_tables(tables, folder_path):
+    os.makedirs(folder_path, exist_ok=True)
+    paths = []
+    for table_id, df_table in tables.items():
+        output_path = os.path.join(folder_path, f"{table_id}.csv")
+        df_table.to_csv(output_path, index=False)
+        paths.append(output_path)
+    return paths
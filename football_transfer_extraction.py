@@ -1,10 +1,10 @@
+import argparse
+import asyncio
 import math
-import os
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import pandas as pd
-from bs4 import BeautifulSoup
+import aiohttp
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -12,10 +12,17 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from tqdm import tqdm
 
+import metrics
+import page_cache
+import proxy_pool
+import site_urls
+from crawl_sink import PageSink
+from listing_parsers import COLUMNS, parse_html
+from market_snapshot import CHANGES_CSV, MarketSnapshot, append_changes
+from parse_pipeline import ParsePipeline
+
 # 🔗 Constants
-BASE_URL = (
-    "https://www.footballtransfers.com/en/values/players/most-valuable-players/{}"
-)
+BASE_URL = site_urls.FOOTBALLTRANSFERS + "/en/values/players/most-valuable-players/{}"
 MAX_RETRIES = 8
 THREADS = 7
 MAX_PAGES = 1353
@@ -27,6 +34,22 @@ DATA_FILE = "most_valuable_players_fast.csv"
 SCRAPED_PAGES_LOG = "scraped_pages.txt"
 FAILED_PAGES_LOG = "failed_pages.txt"
 
+# 🌐 Fetch engine: "http" (pooled aiohttp, Selenium only as fallback) or "selenium"
+FETCH_ENGINE = "http"
+HTTP_CONCURRENCY = 16
+HTTP_TIMEOUT_SECONDS = 30
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# 📉 Delta mode: re-check the most valuable pages first, stop once nothing moves
+EARLY_STOP_PAGES = 20  # Consecutive unchanged pages before the walk down the table stops
+SWEEP_PAGES = 50  # Plus this many least recently checked pages, so the tail is refreshed too
+
 
 # 📄 Page Logging Helpers
 def load_page_log(file_path):
@@ -37,14 +60,11 @@ def load_page_log(file_path):
         return set()
 
 
-def log_page(file_path, page_number):
-    with open(file_path, "a") as f:
-        f.write(f"{page_number}\n")
-
-
-# 🧭 Setup WebDriver
-def create_driver():
+# 🧭 Setup WebDriver (egress through the given proxy, if any)
+def create_driver(proxy=None):
     options = Options()
+    if proxy:
+        proxy_pool.selenium_options(options, proxy)
     options.binary_location = CHROMIUM_PATH
     options.add_argument("--headless=chrome")
     options.add_argument("--no-sandbox")
@@ -64,140 +84,235 @@ def create_driver():
     return webdriver.Chrome(options=options)
 
 
-# 🧪 Parse HTML Page
-def parse_html(page_source):
-    soup = BeautifulSoup(page_source, "html.parser")
-    rows = soup.find_all("tr")
-    data = []
+# 💾 Persist one parsed page (through the single writer started in main)
+sink = None
+pipeline = None  # Parser processes, so fetch threads never parse under the GIL
+
 
-    for row in rows:
+def save_page(page, data):
+    sink.put_page(page, data)
+
+
+def on_parsed_page(page, data):
+    if data:
+        save_page(page, data)
+    else:
+        print(f"⚠️ No data found on page {page}")
+
+
+# 🌐 Pooled HTTP fetch (no browser)
+async def fetch_page_http(session, semaphore, page, ttl=None):
+    url = BASE_URL.format(page)
+    for attempt in range(1, MAX_RETRIES + 1):
         try:
-            name_tag = row.select_one("td.td-player a[title]")
-            if not name_tag:
-                continue
-            name = name_tag.get_text(strip=True)
-            player_url = "https://www.footballtransfers.com" + name_tag["href"]
-
-            age_tag = row.select_one("td.age")
-            age = age_tag.get_text(strip=True) if age_tag else None
-
-            club_tag = row.select_one("td.td-player .sub-text a[title]")
-            club = club_tag.get_text(strip=True) if club_tag else None
-            club_url = (
-                "https://www.footballtransfers.com" + club_tag["href"]
-                if club_tag
-                else None
-            )
+            async with semaphore:
+                response = await proxy_pool.fetch_async(session, url, ttl=ttl)
+            if response.status_code == 200:
+                return response.text
+            if response.status_code == 404:
+                return None
+            raise aiohttp.ClientError(f"HTTP {response.status_code}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            metrics.FETCH_RETRIES.inc(stage="listing_http")
+            print(f"🔁 HTTP retry {attempt} failed on page {page}: {e}")
+            await asyncio.sleep(2 * attempt)
+    return None
+
+
+def http_session():
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_CONCURRENCY, limit_per_host=HTTP_CONCURRENCY, keepalive_timeout=60
+    )
+    timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HTTP_HEADERS)
+
+
+# Returns the pages that still need the Selenium fallback
+async def scrape_pages_http(pages):
+    fallback_pages = []
+    semaphore = asyncio.Semaphore(HTTP_CONCURRENCY)
+    # Held from fetch to parsed: fetched pages can only run pipeline.capacity ahead of the parsers
+    in_flight = asyncio.Semaphore(HTTP_CONCURRENCY + pipeline.capacity)
+
+    async with http_session() as session:
+
+        async def handle(page):
+            async with in_flight:
+                html = await fetch_page_http(session, semaphore, page)
+                data = await pipeline.parse_async(html) if html else []
+            if data:
+                save_page(page, data)
+            else:
+                # No td.td-player rows: blocked, JS-rendered or failed → browser fallback
+                fallback_pages.append(page)
 
-            position_tag = row.select_one("td.td-player span.sub-text")
-            position = (
-                position_tag.get_text(strip=True).split("•")[-1].strip()
-                if position_tag
-                else None
-            )
+        tasks = [asyncio.create_task(handle(page)) for page in pages]
+        for task in tqdm(
+            asyncio.as_completed(tasks), total=len(tasks), desc="🌐 HTTP pages"
+        ):
+            await task
 
-            nationality_tag = row.select_one("td.td-player figure img")
-            nationality = nationality_tag["alt"] if nationality_tag else None
+    return sorted(fallback_pages)
 
-            skill_tag = row.select_one("div.table-skill__skill")
-            skill = float(skill_tag.get_text(strip=True)) if skill_tag else None
 
-            potential_tag = row.select_one("div.table-skill__pot")
-            potential = (
-                float(potential_tag.get_text(strip=True)) if potential_tag else None
-            )
+# 📉 Walk the value table top-down in batches until EARLY_STOP_PAGES pages in a row are unchanged
+async def crawl_delta(snapshot, max_pages=MAX_PAGES, early_stop=EARLY_STOP_PAGES, sweep=SWEEP_PAGES):
+    baseline = snapshot.is_empty()  # First run: record every page, report nothing
+    changes, failed, checked = [], [], set()
+    semaphore = asyncio.Semaphore(HTTP_CONCURRENCY)
 
-            value_tag = row.select_one("span.player-tag")
-            value = (
-                value_tag.get_text(strip=True).replace("€", "") if value_tag else None
-            )
+    async with http_session() as session:
 
-            if value and "M" in value:
-                market_value = float(value.replace("M", "")) * 1e6
-            elif value and "K" in value:
-                market_value = float(value.replace("K", "")) * 1e3
-            else:
-                market_value = None
-
-            data.append(
-                {
-                    "Name": name,
-                    "Player URL": player_url,
-                    "Age": age,
-                    "Club": club,
-                    "Club URL": club_url,
-                    "Position": position,
-                    "Nationality": nationality,
-                    "Skill": skill,
-                    "Potential": potential,
-                    "Market Value (€)": market_value,
-                }
+        async def check(pages):
+            # ttl=0: always ask the site, a 304 still costs no body
+            htmls = await asyncio.gather(
+                *(fetch_page_http(session, semaphore, page, ttl=0) for page in pages)
             )
-        except Exception as e:
-            print(f"⚠️ Parse error: {e}")
-    return data
+            streak_breaks = []
+            for page, html in zip(pages, htmls):
+                data = parse_html(html) if html else []
+                if not data:
+                    failed.append(page)
+                    continue
+                checked.add(page)
+                page_changed, page_changes = snapshot.apply_page(page, data)
+                if not baseline:
+                    changes.extend(page_changes)
+                streak_breaks.append(page_changed)
+            return streak_breaks
+
+        streak = 0
+        for start in range(1, max_pages + 1, HTTP_CONCURRENCY):
+            pages = list(range(start, min(start + HTTP_CONCURRENCY, max_pages + 1)))
+            for page_changed in await check(pages):
+                streak = 0 if page_changed else streak + 1
+            if not baseline and streak >= early_stop:
+                print(f"🛑 {streak} unchanged pages in a row, stopping the walk at page {pages[-1]}")
+                break
+
+        if not baseline and sweep:
+            tail = [p for p in snapshot.stalest_pages(sweep + len(checked), max_pages) if p not in checked]
+            await check(tail[:sweep])
+
+    return changes, sorted(checked), sorted(failed), baseline
+
+
+# 🔔 Only the players whose value, skill or potential moved get their downstream data refreshed
+def trigger_downstream(player_urls):
+    # Imported here: the listing crawl itself needs neither
+    import transfer_history
+    from extract_all_stat_fbref import requeue_players
+
+    for name, refresh in [("transfer history", transfer_history.refresh_players), ("fbref", requeue_players)]:
+        try:
+            refresh(player_urls)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"⚠️ Skipped the {name} refresh: {e}")
+
+
+def run_delta(args):
+    snapshot = MarketSnapshot()
+    try:
+        changes, checked, failed, baseline = asyncio.run(
+            crawl_delta(snapshot, args.max_pages, args.early_stop, args.sweep)
+        )
+    finally:
+        snapshot.close()
+    append_changes(changes)
+
+    print("\n📊 Delta summary:")
+    print(f"🔎 Checked pages: {len(checked)} of {args.max_pages}, failed: {len(failed)}")
+    if baseline:
+        print("🧬 Baseline fingerprints recorded; changes are reported from the next run on")
+        return
+
+    fields = {}
+    for _, _, _, _, field, _, _ in changes:
+        fields[field] = fields.get(field, 0) + 1
+    players = sorted({change[2] for change in changes})
+    print(f"📈 {len(players)} players changed: {fields or 'nothing'} (see '{CHANGES_CSV}')")
+    if players and args.downstream:
+        trigger_downstream(players)
 
 
 # 🚜 Scrape Range
 def scrape_page_range(start_page, end_page, scraped_pages):
-    driver = create_driver()
-    wait = WebDriverWait(driver, TIMEOUT_SECONDS)
-
-    for page in tqdm(
+    scrape_pages(
         range(start_page, end_page + 1),
+        scraped_pages,
         desc=f"Thread {start_page}-{end_page}",
-        leave=False,
-    ):
+    )
+
+
+def scrape_pages(pages, scraped_pages, desc="Selenium pages"):
+    pool = proxy_pool.default_pool()
+    proxy = pool.try_acquire() if pool else None
+    driver = create_driver(proxy)
+    wait = WebDriverWait(driver, TIMEOUT_SECONDS)
+
+    for page in tqdm(pages, desc=desc, leave=False):
         if page in scraped_pages:
             print(f"⏭️ Skipping page {page} (already scraped)")
             continue
 
+        url = BASE_URL.format(page)
+        cached = page_cache.default_cache().get_text(url)
+        data = pipeline.parse(cached) if cached else []
+        if data:
+            save_page(page, data)
+            continue
+
         for attempt in range(1, MAX_RETRIES + 1):
+            if proxy and not pool.is_healthy(proxy):
+                # Rotate: this driver's egress IP was evicted
+                driver.quit()
+                pool.release(proxy)
+                proxy = pool.try_acquire()
+                driver = create_driver(proxy)
+                wait = WebDriverWait(driver, TIMEOUT_SECONDS)
             try:
-                url = BASE_URL.format(page)
-                driver.get(url)
+                start = time.perf_counter()
+                with metrics.FETCH_SECONDS.time(domain=metrics.domain(url)):
+                    driver.get(url)
                 wait.until(
                     EC.presence_of_element_located(
                         (By.CSS_SELECTOR, "td.td-player a[title]")
                     )
                 )
-                data = parse_html(driver.page_source)
-
-                if data:
-                    df = pd.DataFrame(data)
-                    df.to_csv(
-                        DATA_FILE,
-                        mode="a",
-                        header=not os.path.exists(DATA_FILE),
-                        index=False,
-                    )
-                    log_page(SCRAPED_PAGES_LOG, page)
-                    print(f"✅ Saved page {page} with {len(data)} players")
-                else:
-                    print(f"⚠️ No data found on page {page}")
+                if proxy:
+                    pool.report(proxy, True, time.perf_counter() - start)
+                page_source = driver.page_source
+                page_cache.default_cache().put(url, page_source)
+                # Parsed and saved by the pipeline while this driver loads the next page
+                pipeline.submit(page, page_source)
                 break
             except Exception as e:
+                if proxy:
+                    pool.report(proxy, False)
+                metrics.FETCH_RETRIES.inc(stage="listing_selenium")
                 print(f"🔁 Retry {attempt} failed on page {page}: {e}")
                 time.sleep(2 * attempt)
                 if attempt == MAX_RETRIES:
-                    log_page(FAILED_PAGES_LOG, page)
+                    sink.put_failed(page)
                     print(f"❌ Failed page {page} after {MAX_RETRIES} retries")
     driver.quit()
+    if proxy:
+        pool.release(proxy)
 
 
-# 🚀 Main Execution
-def main():
-    chunk_size = math.ceil(MAX_PAGES / THREADS)
-    ranges = [
-        (i, min(i + chunk_size - 1, MAX_PAGES))
-        for i in range(1, MAX_PAGES + 1, chunk_size)
-    ]
-    scraped_pages = load_page_log(SCRAPED_PAGES_LOG)
+# 🧵 Run Selenium over a list of pages, split across THREADS drivers
+def scrape_pages_selenium(pages, scraped_pages):
+    if not pages:
+        return
+    chunk_size = math.ceil(len(pages) / THREADS)
+    chunks = [pages[i : i + chunk_size] for i in range(0, len(pages), chunk_size)]
 
     with ThreadPoolExecutor(max_workers=THREADS) as executor:
         futures = [
-            executor.submit(scrape_page_range, start, end, scraped_pages)
-            for start, end in ranges
+            executor.submit(
+                scrape_pages, chunk, scraped_pages, f"Thread {chunk[0]}-{chunk[-1]}"
+            )
+            for chunk in chunks
         ]
         for future in tqdm(
             as_completed(futures), total=len(futures), desc="🔄 Scraping Progress"
@@ -207,6 +322,42 @@ def main():
             except Exception as e:
                 print(f"❌ Thread error: {e}")
 
+
+# 🚀 Main Execution
+def main():
+    global sink, pipeline
+    parser = argparse.ArgumentParser(description="Crawl the footballtransfers most-valuable-players table")
+    parser.add_argument("--delta", action="store_true", help="refresh mode: changed pages only, top first")
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES)
+    parser.add_argument("--early-stop", type=int, default=EARLY_STOP_PAGES)
+    parser.add_argument("--sweep", type=int, default=SWEEP_PAGES)
+    parser.add_argument(
+        "--no-downstream", dest="downstream", action="store_false",
+        help="only report changes, do not refresh transfer history or re-queue fbref jobs",
+    )
+    args = parser.parse_args()
+    if args.delta:
+        metrics.start_exporter("football_transfer_delta")
+        return run_delta(args)
+
+    metrics.start_exporter("football_transfer_extraction")
+    sink = PageSink(DATA_FILE, COLUMNS, SCRAPED_PAGES_LOG, FAILED_PAGES_LOG)
+    sink.start()  # Rolls back rows written after the last checkpoint of a crashed run
+    pipeline = ParsePipeline(on_parsed_page)
+
+    scraped_pages = load_page_log(SCRAPED_PAGES_LOG)
+    pending = [p for p in range(1, MAX_PAGES + 1) if p not in scraped_pages]
+
+    try:
+        if FETCH_ENGINE == "http":
+            pending = asyncio.run(scrape_pages_http(pending))
+            print(f"🌐 HTTP engine done, {len(pending)} pages fall back to Selenium")
+
+        scrape_pages_selenium(pending, scraped_pages)
+    finally:
+        pipeline.close()  # Delivers every page still being parsed to the sink first
+        sink.close()
+
     # 📊 Summary Report
     scraped = load_page_log(SCRAPED_PAGES_LOG)
     failed = load_page_log(FAILED_PAGES_LOG)
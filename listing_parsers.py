@@ -0,0 +1,279 @@
+import sys
+
+from bs4 import BeautifulSoup
+
+import metrics
+import site_urls
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Settings
+SITE_URL = site_urls.FOOTBALLTRANSFERS
+PARSER_ENGINE = "lxml" if lxml is not None else "bs4"  # "bs4", "lxml" or "selectolax"
+COLUMNS = [
+    "Name",
+    "Player URL",
+    "Age",
+    "Club",
+    "Club URL",
+    "Position",
+    "Nationality",
+    "Skill",
+    "Potential",
+    "Market Value (€)",
+]
+
+
+# 🧮 Shared field conversion, identical for every engine
+def build_record(name, href, age, club, club_href, position, nationality, skill, potential, value):
+    player_url = SITE_URL + href
+    club_url = SITE_URL + club_href if club is not None else None
+    position = position.split("•")[-1].strip() if position is not None else None
+    skill = float(skill) if skill is not None else None
+    potential = float(potential) if potential is not None else None
+    value = value.replace("€", "") if value is not None else None
+
+    if value and "M" in value:
+        market_value = float(value.replace("M", "")) * 1e6
+    elif value and "K" in value:
+        market_value = float(value.replace("K", "")) * 1e3
+    else:
+        market_value = None
+
+    return {
+        "Name": name,
+        "Player URL": player_url,
+        "Age": age,
+        "Club": club,
+        "Club URL": club_url,
+        "Position": position,
+        "Nationality": nationality,
+        "Skill": skill,
+        "Potential": potential,
+        "Market Value (€)": market_value,
+    }
+
+
+# 🐢 Reference engine: BeautifulSoup + html.parser, one CSS query per field
+def parse_html_bs4(page_source):
+    soup = BeautifulSoup(page_source, "html.parser")
+    rows = soup.find_all("tr")
+    data = []
+
+    for row in rows:
+        try:
+            name_tag = row.select_one("td.td-player a[title]")
+            if not name_tag:
+                continue
+
+            def text(selector):
+                tag = row.select_one(selector)
+                return tag.get_text(strip=True) if tag else None
+
+            club_tag = row.select_one("td.td-player .sub-text a[title]")
+            nationality_tag = row.select_one("td.td-player figure img")
+
+            data.append(
+                build_record(
+                    name_tag.get_text(strip=True),
+                    name_tag["href"],
+                    text("td.age"),
+                    club_tag.get_text(strip=True) if club_tag else None,
+                    club_tag["href"] if club_tag else None,
+                    text("td.td-player span.sub-text"),
+                    nationality_tag["alt"] if nationality_tag else None,
+                    text("div.table-skill__skill"),
+                    text("div.table-skill__pot"),
+                    text("span.player-tag"),
+                )
+            )
+        except Exception as e:
+            print(f"⚠️ Parse error: {e}")
+    return data
+
+
+# ⚡ lxml engine: one depth-first walk per row collects every field
+def _lxml_text(element):
+    # Same joining rule as BeautifulSoup's get_text(strip=True)
+    return "".join(s.strip() for s in element.itertext() if s.strip())
+
+
+def _lxml_row_fields(row):
+    found = {}
+    # (element, inside td.td-player, inside .sub-text under td.td-player, inside figure under td.td-player)
+    stack = [(child, False, False, False) for child in reversed(row)]
+
+    while stack:
+        element, in_player, in_sub, in_figure = stack.pop()
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue  # comments / processing instructions
+        classes = element.get("class", "").split()
+
+        if tag == "td" and "age" in classes:
+            found.setdefault("age", element)
+        elif tag == "a" and in_player and element.get("title") is not None:
+            found.setdefault("name", element)
+            if in_sub:
+                found.setdefault("club", element)
+        elif tag == "span":
+            if "sub-text" in classes and in_player:
+                found.setdefault("position", element)
+            if "player-tag" in classes:
+                found.setdefault("value", element)
+        elif tag == "div":
+            if "table-skill__skill" in classes:
+                found.setdefault("skill", element)
+            if "table-skill__pot" in classes:
+                found.setdefault("potential", element)
+        elif tag == "img" and in_figure:
+            found.setdefault("nationality", element)
+
+        child_flags = (
+            in_player or (tag == "td" and "td-player" in classes),
+            in_sub or (in_player and "sub-text" in classes),
+            in_figure or (in_player and tag == "figure"),
+        )
+        stack.extend((child, *child_flags) for child in reversed(element))
+
+    return found
+
+
+_LXML_PARSER = lxml.html.HTMLParser(encoding="utf-8") if lxml is not None else None
+
+
+def parse_html_lxml(page_source):
+    if isinstance(page_source, str):
+        page_source = page_source.encode("utf-8")
+    try:
+        root = lxml.html.fromstring(page_source, parser=_LXML_PARSER)
+    except Exception:
+        return []
+    data = []
+
+    for row in root.iter("tr"):
+        try:
+            found = _lxml_row_fields(row)
+            name_tag = found.get("name")
+            if name_tag is None:
+                continue
+
+            def text(key):
+                return _lxml_text(found[key]) if key in found else None
+
+            club_tag = found.get("club")
+            nationality_tag = found.get("nationality")
+
+            data.append(
+                build_record(
+                    _lxml_text(name_tag),
+                    name_tag.attrib["href"],
+                    text("age"),
+                    _lxml_text(club_tag) if club_tag is not None else None,
+                    club_tag.attrib["href"] if club_tag is not None else None,
+                    text("position"),
+                    nationality_tag.attrib["alt"] if nationality_tag is not None else None,
+                    text("skill"),
+                    text("potential"),
+                    text("value"),
+                )
+            )
+        except Exception as e:
+            print(f"⚠️ Parse error: {e}")
+    return data
+
+
+# ⚡ selectolax engine: lexbor CSS queries in C
+def parse_html_selectolax(page_source):
+    tree = HTMLParser(page_source)
+    data = []
+
+    for row in tree.css("tr"):
+        try:
+            name_tag = row.css_first("td.td-player a[title]")
+            if name_tag is None:
+                continue
+
+            def text(selector):
+                tag = row.css_first(selector)
+                return tag.text(strip=True) if tag is not None else None
+
+            club_tag = row.css_first("td.td-player .sub-text a[title]")
+            nationality_tag = row.css_first("td.td-player figure img")
+
+            data.append(
+                build_record(
+                    name_tag.text(strip=True),
+                    name_tag.attributes["href"],
+                    text("td.age"),
+                    club_tag.text(strip=True) if club_tag is not None else None,
+                    club_tag.attributes["href"] if club_tag is not None else None,
+                    text("td.td-player span.sub-text"),
+                    nationality_tag.attributes["alt"] if nationality_tag is not None else None,
+                    text("div.table-skill__skill"),
+                    text("div.table-skill__pot"),
+                    text("span.player-tag"),
+                )
+            )
+        except Exception as e:
+            print(f"⚠️ Parse error: {e}")
+    return data
+
+
+ENGINES = {
+    "bs4": parse_html_bs4,
+    "lxml": parse_html_lxml,
+    "selectolax": parse_html_selectolax,
+}
+
+
+# 🧪 Parse HTML Page
+def parse_html(page_source, engine=None):
+    engine = engine or PARSER_ENGINE
+    with metrics.PARSE_SECONDS.time(parser=f"listing_{engine}"):
+        records = ENGINES[engine](page_source)
+    metrics.PARSED_ROWS.inc(len(records), parser=f"listing_{engine}")
+    return records
+
+
+# 🔍 Golden comparison of an engine against the BeautifulSoup reference
+def check_equivalence(page_source, engine):
+    expected = parse_html_bs4(page_source)
+    actual = parse_html(page_source, engine)
+    mismatches = [
+        (i, want, got)
+        for i, (want, got) in enumerate(zip(expected, actual))
+        if want != got
+    ]
+    if len(expected) != len(actual):
+        mismatches.append((None, len(expected), len(actual)))
+    return mismatches
+
+
+if __name__ == "__main__":
+    # python listing_parsers.py page1.html page2.html ...
+    engines = [
+        name
+        for name, module in [("lxml", lxml), ("selectolax", HTMLParser)]
+        if module is not None
+    ]
+    failures = 0
+    for path in sys.argv[1:]:
+        with open(path, "r", encoding="utf-8") as f:
+            page_source = f.read()
+        for engine in engines:
+            mismatches = check_equivalence(page_source, engine)
+            status = "✅" if not mismatches else f"❌ {len(mismatches)} mismatches"
+            print(f"{path} [{engine}]: {status}")
+            for mismatch in mismatches[:5]:
+                print(f"   {mismatch}")
+            failures += bool(mismatches)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,122 @@
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+# Settings
+SNAPSHOT_PATH = "market_snapshot.sqlite"  # Latest fingerprint per listing page and latest values per player
+CHANGES_CSV = "market_value_changes.csv"  # One row per changed field, appended by every delta crawl
+TRACKED_FIELDS = ["Market Value (€)", "Skill", "Potential"]  # Stored as value, skill, potential
+FINGERPRINT_FIELDS = ["Player URL", "Club", *TRACKED_FIELDS]
+CHANGE_COLUMNS = ["Checked At", "Page", "Player URL", "Name", "Field", "Old", "New"]
+
+
+# 🧬 Same rows in the same order → same fingerprint
+def fingerprint(records):
+    rows = [[record.get(field) for field in FINGERPRINT_FIELDS] for record in records]
+    return hashlib.sha1(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class MarketSnapshot:
+    def __init__(self, path=SNAPSHOT_PATH):
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                page INTEGER PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                checked_at REAL NOT NULL,
+                changed_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS players (
+                url TEXT PRIMARY KEY,
+                name TEXT,
+                page INTEGER,
+                value REAL,
+                skill REAL,
+                potential REAL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_checked ON pages (checked_at)")
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def is_empty(self):
+        return self._db.execute("SELECT 1 FROM pages LIMIT 1").fetchone() is None
+
+    # Pages not looked at for the longest time (rotating full-table sweep)
+    def stalest_pages(self, limit, max_page):
+        rows = self._db.execute(
+            "SELECT page FROM pages WHERE page <= ? ORDER BY checked_at LIMIT ?", (max_page, limit)
+        )
+        return [row[0] for row in rows]
+
+    # 🔍 Compare one freshly parsed page; returns (page changed, field changes)
+    def apply_page(self, page, records, now=None):
+        now = now if now is not None else time.time()
+        new_fingerprint = fingerprint(records)
+        row = self._db.execute("SELECT fingerprint FROM pages WHERE page = ?", (page,)).fetchone()
+        if row is not None and row[0] == new_fingerprint:
+            self._db.execute("UPDATE pages SET checked_at = ? WHERE page = ?", (now, page))
+            self._db.commit()
+            return False, []
+
+        urls = [record["Player URL"] for record in records]
+        known = {
+            url: (name, value, skill, potential)
+            for url, name, value, skill, potential in self._db.execute(
+                f"SELECT url, name, value, skill, potential FROM players "
+                f"WHERE url IN ({', '.join('?' * len(urls))})",
+                urls,
+            )
+        }
+        checked_at = datetime.fromtimestamp(now).isoformat(timespec="seconds")
+        changes = []
+        for record in records:
+            url = record["Player URL"]
+            if url not in known:
+                changes.append([checked_at, page, url, record["Name"], "new", None, record.get("Market Value (€)")])
+                continue
+            for field, old in zip(TRACKED_FIELDS, known[url][1:]):
+                new = record.get(field)
+                if new != old:
+                    changes.append([checked_at, page, url, record["Name"], field, old, new])
+
+        self._db.execute(
+            "INSERT INTO pages VALUES (?, ?, ?, ?) ON CONFLICT (page) DO UPDATE SET "
+            "fingerprint = excluded.fingerprint, checked_at = excluded.checked_at, "
+            "changed_at = excluded.changed_at",
+            (page, new_fingerprint, now, now),
+        )
+        self._db.executemany(
+            "INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (r["Player URL"], r["Name"], page, *(r.get(f) for f in TRACKED_FIELDS), now)
+                for r in records
+            ],
+        )
+        self._db.commit()
+        return True, changes
+
+
+def append_changes(changes, path=CHANGES_CSV):
+    if not changes:
+        return
+    header = not os.path.exists(path)
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(CHANGE_COLUMNS)
+        writer.writerows(changes)
@@ -0,0 +1,238 @@
+import atexit
+import bisect
+import contextlib
+import json
+import os
+import queue
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Settings
+METRICS_DIR = "metrics"  # <name>.json snapshots and <name>.prom for a node_exporter textfile collector
+EXPORT_EVERY_SECONDS = 15
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LOG_FLUSH_LINES = 200  # Buffered log lines before a write...
+LOG_FLUSH_SECONDS = 1.0  # ...or after this long, whichever comes first
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _label_text(key):
+    if not key:
+        return ""
+    escaped = [
+        k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"' for k, v in key
+    ]
+    return "{" + ",".join(escaped) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+        self._values = {}
+
+
+# ➕ Monotonic count per label set
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+# 🎚️ Current value per label set (queue depth, workers alive, ...)
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    samples = Counter.samples
+
+
+# 📊 Bucketed observations per label set
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    # ⏱️ with FETCH_SECONDS.time(domain=...):
+    @contextlib.contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        result = []
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                result.append((f"{self.name}_bucket", key + (("le", le),), cumulative))
+            result.append((f"{self.name}_sum", key, total))
+            result.append((f"{self.name}_count", key, cumulative))
+        return result
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, help, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name, help=""):
+        return self._get(Counter, name, help)
+
+    def gauge(self, name, help=""):
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name, help="", buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    # 📤 Prometheus text exposition format
+    def prometheus_text(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, value in metric.samples():
+                lines.append(f"{name}{_label_text(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    # 📤 JSON-friendly snapshot: {metric: [{labels..., value}]}
+    def snapshot(self):
+        result = {"timestamp": time.time(), "pid": os.getpid(), "metrics": {}}
+        for metric in list(self._metrics.values()):
+            result["metrics"][metric.name] = [
+                {**dict(key), "sample": name, "value": value} for name, key, value in metric.samples()
+            ]
+        return result
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+# 📏 Shared stage metrics
+FETCH_SECONDS = histogram("scraper_fetch_seconds", "Network fetch latency")
+FETCH_BYTES = counter("scraper_fetch_bytes_total", "Response body bytes")
+FETCH_STATUS = counter("scraper_fetch_responses_total", "Responses by status code")
+FETCH_RETRIES = counter("scraper_fetch_retries_total", "Retried fetches")
+CACHE_RESULTS = counter("scraper_cache_lookups_total", "Page cache hit / revalidated / miss")
+PARSE_SECONDS = histogram("scraper_parse_seconds", "Time spent parsing one page")
+PARSED_ROWS = counter("scraper_parsed_rows_total", "Rows produced by parsers")
+WRITE_SECONDS = histogram("scraper_write_seconds", "Time spent in one batched write")
+WRITTEN_ROWS = counter("scraper_written_rows_total", "Rows made durable by writers")
+QUEUE_DEPTH = gauge("scraper_queue_depth", "Items waiting in a work or writer queue")
+
+
+def domain(url):
+    return urlsplit(url).netloc or "unknown"
+
+
+def write_files(name, registry=REGISTRY, folder=METRICS_DIR):
+    os.makedirs(folder, exist_ok=True)
+    for suffix, text in [
+        (".json", json.dumps(registry.snapshot(), indent=1)),
+        (".prom", registry.prometheus_text()),
+    ]:
+        path = os.path.join(folder, name + suffix)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+# 🕒 Background thread rewriting metrics/<name>.{json,prom}; a last write happens at exit
+def start_exporter(name, every=EXPORT_EVERY_SECONDS, registry=REGISTRY):
+    def loop():
+        while True:
+            time.sleep(every)
+            write_files(name, registry)
+
+    threading.Thread(target=loop, name=f"metrics-{name}", daemon=True).start()
+    atexit.register(write_files, name, registry)
+
+
+# 📝 Non-blocking log file: callers enqueue, one thread writes in batches
+class LogWriter:
+    def __init__(self, path, mode="a"):
+        self.path = path
+        self._queue = queue.SimpleQueue()
+        self._file = open(path, mode, encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name=f"log-{path}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, line):
+        self._queue.put(line if line.endswith("\n") else line + "\n")
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        buffered = []
+        last_flush = time.monotonic()
+        while True:
+            try:
+                line = self._queue.get(timeout=LOG_FLUSH_SECONDS)
+            except queue.Empty:
+                line = ""
+            if line is None:
+                break
+            if line:
+                buffered.append(line)
+            if len(buffered) >= LOG_FLUSH_LINES or (
+                buffered and time.monotonic() - last_flush >= LOG_FLUSH_SECONDS
+            ):
+                self._file.writelines(buffered)
+                self._file.flush()
+                buffered.clear()
+                last_flush = time.monotonic()
+        self._file.writelines(buffered)
+        self._file.close()
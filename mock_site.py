@@ -0,0 +1,246 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote_plus, urlsplit
+
+from benchmarks.make_fixtures import (
+    CLUBS,
+    POSITIONS,
+    fbref_all_comps_page,
+    fbref_profile_page,
+    listing_page,
+    transfer_page,
+)
+
+# Settings
+HOST = "127.0.0.1"
+PORT = 8900
+SEED = 7
+LISTING_PAGES = 1353  # Same page count as the real most-valuable-players listing
+LATENCY_MS = 150  # Mean response delay...
+JITTER_MS = 100  # ...plus or minus up to this much
+ERROR_RATE = 0.01  # Share of requests answered with a 500
+RATE_LIMIT = 0  # Requests per second per site before 429s; 0 = unlimited
+BURST_EVERY_SECONDS = 0  # Every this many seconds...
+BURST_SECONDS = 10  # ...the site answers only throttle statuses for this long; 0 = no bursts
+THROTTLE_STATUS = {"duckduckgo": 418, "fbref": 429, "footballtransfers": 429}
+STATS_EVERY_SECONDS = 10
+
+LISTING_RE = re.compile(r"^/en/values/players/most-valuable-players/(\d+)/?$")
+TRANSFER_RE = re.compile(r"^/en/players/[^/]+/transfer-history/?$")
+FBREF_ALL_COMPS_RE = re.compile(r"^/en/players/([0-9a-f]{8})/all_comps/")
+FBREF_PROFILE_RE = re.compile(r"^/en/players/([0-9a-f]{8})/[^/]+/?$")
+FBREF_LIST_RE = re.compile(r"^/en/(comps|squads)/")
+
+
+def page_rng(config, path):
+    # Same URL, same page: reruns and delta crawls see a stable site
+    return random.Random(f"{config.seed}:{path}")
+
+
+def fbref_id(name):
+    return hashlib.md5(name.encode("utf-8")).hexdigest()[:8]
+
+
+# 📄 Competition/squad stats page in the data-stat layout fbref_discovery reads
+def fbref_player_list_page(rng, rows=40):
+    cells = []
+    for _ in range(rows):
+        name = f"Player {rng.randint(1, 10**6)}"
+        cells.append(
+            f'<tr><td data-stat="player"><a href="/en/players/{fbref_id(name)}/{name.replace(" ", "-")}">{name}</a></td>'
+            f'<td data-stat="team">{rng.choice(CLUBS)}</td><td data-stat="position">{rng.choice(["FW", "MF", "DF", "GK"])}</td>'
+            f'<td data-stat="birth_year">{rng.randint(1985, 2008)}</td></tr>'
+        )
+    return f'<html><body><h1>2024-2025 Stats</h1><table id="stats_standard"><tbody>{"".join(cells)}</tbody></table></body></html>'
+
+
+# 📄 Search results with one fbref player link, as the resolvers expect
+def search_page(rng, query):
+    name = re.sub(r"^site:fbref\.com\s+|\s+fbref profile$", "", query).strip() or "Unknown"
+    slug = name.split(" ")[0] if name else "player"
+    return (
+        f"<html><body><div class='results'>"
+        f"<a href='https://example.com/{slug}'>Unrelated</a>"
+        f'<a href="https://fbref.com/en/players/{fbref_id(name)}/{slug}">{name} Stats | FBref.com</a>'
+        f"<span>{rng.choice(POSITIONS)}</span></div></body></html>"
+    )
+
+
+class MockSite:
+    def __init__(self, config):
+        self.config = config
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.tokens = {}
+        self.recorded = {}
+        if config.fixtures:
+            for path in glob.glob(os.path.join(config.fixtures, "*.html")):
+                kind = os.path.basename(path).rsplit("_", 1)[0]
+                with open(path, "r", encoding="utf-8") as f:
+                    self.recorded.setdefault(kind, []).append(f.read())
+
+    def count(self, site, status):
+        with self.lock:
+            key = f"{site} {status}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.counts)
+        elapsed = time.time() - self.started
+        total = sum(counts.values())
+        return {"elapsed_s": round(elapsed, 1), "requests": total, "per_s": round(total / elapsed, 2), "counts": counts}
+
+    # 🚦 Throttle status if the site is in a burst window or over its rate, else None
+    def throttled(self, site):
+        config = self.config
+        now = time.time()
+        if config.burst_every and (now - self.started) % config.burst_every < config.burst_seconds:
+            return THROTTLE_STATUS[site]
+        if config.rate_limit:
+            with self.lock:
+                tokens, updated = self.tokens.get(site, (config.rate_limit, now))
+                tokens = min(config.rate_limit, tokens + (now - updated) * config.rate_limit)
+                allowed = tokens >= 1
+                self.tokens[site] = (tokens - 1 if allowed else tokens, now)
+            if not allowed:
+                return THROTTLE_STATUS[site]
+        return None
+
+    def recorded_page(self, kind, path):
+        pages = self.recorded.get(kind)
+        if not pages:
+            return None
+        return pages[int(hashlib.md5(path.encode("utf-8")).hexdigest(), 16) % len(pages)]
+
+    # 📄 (status, html) for one site path
+    def render(self, site, path, query):
+        rng = page_rng(self.config, f"{site}{path}?{query}")
+        if site == "footballtransfers":
+            found = LISTING_RE.match(path)
+            if found:
+                if not 1 <= int(found.group(1)) <= self.config.pages:
+                    return 404, "<html><body>Not found</body></html>"
+                return 200, self.recorded_page("listing", path) or listing_page(rng)
+            if TRANSFER_RE.match(path):
+                return 200, self.recorded_page("transfer_history", path) or transfer_page(rng)
+        elif site == "fbref":
+            if FBREF_ALL_COMPS_RE.match(path):
+                return 200, self.recorded_page("fbref_all_comps", path) or fbref_all_comps_page(rng)
+            if FBREF_PROFILE_RE.match(path):
+                return 200, self.recorded_page("fbref_profile", path) or fbref_profile_page(rng)
+            if FBREF_LIST_RE.match(path):
+                return 200, fbref_player_list_page(rng)
+        elif site == "duckduckgo":
+            q = parse_qs(query).get("q", [""])[-1]
+            return 200, self.recorded_page("search", path) or search_page(rng, unquote_plus(q))
+        return 404, "<html><body>Not found</body></html>"
+
+
+def make_handler(mock):
+    config = mock.config
+
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, like the real sites
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path == "/_stats":
+                return self._send(200, json.dumps(mock.stats()), "application/json")
+
+            site, _, path = parts.path.lstrip("/").partition("/")
+            if site not in THROTTLE_STATUS:
+                return self._send(404, "unknown site prefix: use /footballtransfers, /fbref or /duckduckgo")
+            path = "/" + path
+
+            delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+            time.sleep(max(0, delay) / 1000)
+
+            status = mock.throttled(site)
+            if status is not None:
+                body = "I'm a teapot" if status == 418 else "Too Many Requests"
+                mock.count(site, status)
+                return self._send(status, body, headers={"Retry-After": "5"})
+            if random.random() < config.error_rate:
+                mock.count(site, 500)
+                return self._send(500, "Internal Server Error")
+
+            status, html = mock.render(site, path, parts.query)
+            mock.count(site, status)
+            self._send(status, html)
+
+        def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockHandler
+
+
+def report(mock, every):
+    previous = 0
+    while True:
+        time.sleep(every)
+        stats = mock.stats()
+        print(
+            f"📈 {stats['requests']} requests ({(stats['requests'] - previous) / every:.1f}/s now, "
+            f"{stats['per_s']}/s overall) {stats['counts']}"
+        )
+        previous = stats["requests"]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for footballtransfers, fbref and DuckDuckGo")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--pages", type=int, default=LISTING_PAGES, help="listing pages served")
+    parser.add_argument("--latency-ms", type=float, default=LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=JITTER_MS)
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE)
+    parser.add_argument("--rate-limit", type=float, default=RATE_LIMIT, help="requests/s per site")
+    parser.add_argument("--burst-every", type=float, default=BURST_EVERY_SECONDS)
+    parser.add_argument("--burst-seconds", type=float, default=BURST_SECONDS)
+    parser.add_argument("--fixtures", help="folder of recorded <kind>_*.html pages to serve instead")
+    return parser.parse_args(argv)
+
+
+def start(config):
+    mock = MockSite(config)
+    server = ThreadingHTTPServer((config.host, config.port), make_handler(mock))
+    server.daemon_threads = True
+    return mock, server
+
+
+# 🚀 Main Execution
+if __name__ == "__main__":
+    config = parse_args()
+    mock, server = start(config)
+    base = f"http://{config.host}:{server.server_port}"
+    print(f"🧪 Mock site on {base} — point the crawlers at it with:")
+    print(f"   MOCK_SITE_URL={base} PAGE_CACHE=off python football_transfer_extraction.py")
+    threading.Thread(target=report, args=(mock, STATS_EVERY_SECONDS), daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 {json.dumps(mock.stats())}")
@@ -0,0 +1,43 @@
+import unicodedata
+
+# Letters NFKD does not decompose into base + accent
+EXTRA_FOLDS = str.maketrans(
+    {"ø": "o", "ł": "l", "đ": "d", "ð": "d", "þ": "th", "æ": "ae", "œ": "oe", "ı": "i"}
+)
+
+
+# 🔤 "  Martin Ødegaard " → "martin odegaard"
+def normalize_name(value):
+    if not isinstance(value, str):
+        return ""
+    folded = unicodedata.normalize("NFKD", value)
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return " ".join(folded.casefold().translate(EXTRA_FOLDS).split())
+
+
+# 🗂️ Hash lookups over a reference table that already has fbref URLs
+class ReferenceIndex:
+    def __init__(self, df, name_column="Name", team_column="Team", url_column="fbref_url"):
+        known = df[df[url_column].notna()]
+        names = [normalize_name(n) for n in known[name_column]]
+        teams = [normalize_name(t) for t in known[team_column]]
+        urls = list(known[url_column])
+
+        self.by_name_team = {}
+        self.by_name = {}
+        for name, team, url in zip(names, teams, urls):
+            self.by_name_team.setdefault((name, team), url)  # First row wins, as before
+            self.by_name.setdefault(name, set()).add(url)
+
+    # Returns (url, how) or (None, None)
+    def lookup(self, name, team):
+        name = normalize_name(name)
+        url = self.by_name_team.get((name, normalize_name(team)))
+        if url is not None:
+            return url, "name+team"
+
+        # Club changed since the reference was built: only trust an unambiguous name
+        candidates = self.by_name.get(name, ())
+        if len(candidates) == 1:
+            return next(iter(candidates)), "name"
+        return None, None
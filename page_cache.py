@@ -0,0 +1,309 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+import metrics
+import site_urls
+
+# Settings
+CACHE_DIR = "page_cache"
+DEFAULT_TTL_SECONDS = 24 * 3600  # Pages younger than this are served without a request
+MAX_CACHE_BYTES = 5 * 1024**3  # Compressed size on disk before LRU eviction kicks in
+SIZE_CHECK_EVERY = 100  # Puts between size checks against SQLite (other processes share the cache)
+CACHE_ENABLED = os.environ.get("PAGE_CACHE", "on") != "off"  # PAGE_CACHE=off: every fetch hits the network (load tests)
+
+CacheEntry = namedtuple(
+    "CacheEntry", "url content_hash fetched_at etag last_modified size"
+)
+CachedResponse = namedtuple("CachedResponse", "status_code text from_cache")
+
+
+# 🔗 Canonical URL used as the cache key
+def canonical_url(url):
+    parts = urlsplit(url.strip())
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(
+        ((parts.scheme or "https").lower(), parts.netloc.lower(), path, query, "")
+    )
+
+
+class PageCache:
+    def __init__(self, root=CACHE_DIR, ttl=DEFAULT_TTL_SECONDS, max_bytes=MAX_CACHE_BYTES):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+
+        self._db = sqlite3.connect(
+            os.path.join(root, "index.sqlite"), timeout=30, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_hash ON entries (content_hash)")
+        self._db.commit()
+        self._total_bytes = self._stored_bytes()
+        self._puts = 0
+
+    def _object_path(self, content_hash):
+        return os.path.join(self.root, "objects", content_hash[:2], content_hash + ".gz")
+
+    # 🔎 Lookup
+    def get(self, url):
+        if not CACHE_ENABLED:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, content_hash, fetched_at, etag, last_modified, size "
+                "FROM entries WHERE url = ?",
+                (canonical_url(url),),
+            ).fetchone()
+        return CacheEntry(*row) if row else None
+
+    def is_fresh(self, entry, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        return entry is not None and time.time() - entry.fetched_at < ttl
+
+    def read(self, entry):
+        try:
+            with gzip.open(self._object_path(entry.content_hash), "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET accessed_at = ? WHERE url = ?",
+                (time.time(), entry.url),
+            )
+            self._db.commit()
+        return body.decode("utf-8")
+
+    # Cached body if still within TTL, else None (for browser-driven fetchers)
+    def get_text(self, url, ttl=None):
+        entry = self.get(url)
+        if not self.is_fresh(entry, ttl):
+            return None
+        return self.read(entry)
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    # 💾 Store
+    def put(self, url, text, etag=None, last_modified=None):
+        if not CACHE_ENABLED:
+            return
+        body = text.encode("utf-8")
+        content_hash = hashlib.sha256(body).hexdigest()
+        path = self._object_path(content_hash)
+        url = canonical_url(url)
+
+        with self._lock:
+            # One write transaction from the existence check to the INSERT: no put or evict, in this
+            # process or another, can remove the object in between
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if not os.path.exists(path):
+                    self._write_object(path, body)
+                size = os.path.getsize(path)
+                now = time.time()
+                previous = self._db.execute(
+                    "SELECT content_hash, size FROM entries WHERE url = ?", (url,)
+                ).fetchone()
+                if not self._is_used(content_hash):
+                    self._total_bytes += size
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, content_hash, now, now, etag, last_modified, size),
+                )
+                # The page changed: its old body goes unless another URL still points at it
+                if previous is not None and previous[0] != content_hash and not self._is_used(previous[0]):
+                    self._remove_object(previous[0])
+                    self._total_bytes -= previous[1]
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+            self._puts += 1
+            # The local count misses other processes' writes: evict() re-reads the total from SQLite
+            check_size = self._total_bytes > self.max_bytes or self._puts % SIZE_CHECK_EVERY == 0
+        if check_size:
+            self.evict()
+        return content_hash
+
+    def _write_object(self, path, body):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wb", compresslevel=5) as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    # A 304 answer: body unchanged, restart the TTL
+    def revalidated(self, url):
+        with self._lock:
+            now = time.time()
+            self._db.execute(
+                "UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, canonical_url(url)),
+            )
+            self._db.commit()
+
+    # Callers hold self._lock
+    def _is_used(self, content_hash):
+        return self._db.execute(
+            "SELECT 1 FROM entries WHERE content_hash = ? LIMIT 1", (content_hash,)
+        ).fetchone() is not None
+
+    def _remove_object(self, content_hash):
+        try:
+            os.remove(self._object_path(content_hash))
+        except FileNotFoundError:
+            pass
+
+    # Objects shared by several URLs are only counted once; callers hold self._lock (or are __init__)
+    def _stored_bytes(self):
+        return self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM "
+            "(SELECT MAX(size) AS size FROM entries GROUP BY content_hash)"
+        ).fetchone()[0]
+
+    # 🧹 Size-bounded LRU eviction, against the total of every process sharing the cache
+    def evict(self):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                total = self._stored_bytes()
+                if total > self.max_bytes:
+                    victims = self._db.execute(
+                        "SELECT url, content_hash, size FROM entries ORDER BY accessed_at"
+                    )
+                    for url, content_hash, size in victims.fetchall():
+                        if total <= self.max_bytes:
+                            break
+                        self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                        if not self._is_used(content_hash):
+                            self._remove_object(content_hash)
+                            total -= size
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+            self._total_bytes = total
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PageCache()
+        return _default_cache
+
+
+# 🌐 requests fetch through the cache (TTL hit → conditional GET → full GET)
+def fetch(url, session=None, ttl=None, cache=None, **kwargs):
+    url = site_urls.rewrite(url)
+    cache = cache or default_cache()
+    entry = cache.get(url)
+    domain = metrics.domain(url)
+    if cache.is_fresh(entry, ttl):
+        text = cache.read(entry)
+        if text is not None:
+            metrics.CACHE_RESULTS.inc(domain=domain, result="hit")
+            return CachedResponse(200, text, True)
+        entry = None
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    headers.update(cache.conditional_headers(entry))
+    with metrics.FETCH_SECONDS.time(domain=domain):
+        response = (session or requests).get(url, headers=headers, **kwargs)
+    metrics.FETCH_STATUS.inc(domain=domain, status=response.status_code)
+    metrics.FETCH_BYTES.inc(len(response.content or b""), domain=domain)
+
+    if response.status_code == 304 and entry:
+        text = cache.read(entry)
+        if text is not None:
+            cache.revalidated(url)
+            metrics.CACHE_RESULTS.inc(domain=domain, result="revalidated")
+            return CachedResponse(200, text, True)
+    metrics.CACHE_RESULTS.inc(domain=domain, result="miss")
+    if response.status_code == 200:
+        cache.put(
+            url,
+            response.text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+    return CachedResponse(response.status_code, response.text, False)
+
+
+# 🌐 Same flow for an aiohttp ClientSession
+async def fetch_async(session, url, ttl=None, cache=None, **kwargs):
+    url = site_urls.rewrite(url)
+    cache = cache or default_cache()
+    entry = cache.get(url)
+    domain = metrics.domain(url)
+    if cache.is_fresh(entry, ttl):
+        text = cache.read(entry)
+        if text is not None:
+            metrics.CACHE_RESULTS.inc(domain=domain, result="hit")
+            return CachedResponse(200, text, True)
+        entry = None
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    headers.update(cache.conditional_headers(entry))
+    start = time.perf_counter()
+    async with session.get(url, headers=headers, **kwargs) as response:
+        metrics.FETCH_STATUS.inc(domain=domain, status=response.status)
+        if response.status == 304 and entry:
+            metrics.FETCH_SECONDS.observe(time.perf_counter() - start, domain=domain)
+            text = cache.read(entry)
+            if text is not None:
+                cache.revalidated(url)
+                metrics.CACHE_RESULTS.inc(domain=domain, result="revalidated")
+                return CachedResponse(200, text, True)
+        body = await response.read()
+        metrics.FETCH_SECONDS.observe(time.perf_counter() - start, domain=domain)
+        metrics.FETCH_BYTES.inc(len(body), domain=domain)
+        metrics.CACHE_RESULTS.inc(domain=domain, result="miss")
+        text = body.decode(response.get_encoding(), errors="replace")
+        if response.status == 200:
+            cache.put(
+                url,
+                text,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return CachedResponse(response.status, text, False)
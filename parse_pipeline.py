@@ -0,0 +1,80 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+from listing_parsers import PARSER_ENGINE, parse_html
+
+# Settings
+PARSE_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # Parser processes; one core stays free for fetching
+PENDING_PER_WORKER = 4  # Raw pages queued per parser before fetch threads block
+
+
+# Runs in a parser process; the parent records the metrics (each child has its own registry)
+def _parse(page_source, engine):
+    start = time.perf_counter()
+    records = parse_html(page_source, engine)
+    return records, time.perf_counter() - start
+
+
+# 🏭 Fetch threads hand over raw HTML, parser processes return records, one collector delivers them
+class ParsePipeline:
+    def __init__(self, on_records, workers=PARSE_WORKERS, engine=PARSER_ENGINE):
+        self.on_records = on_records  # on_records(page, records) on the collector thread; [] = no rows
+        self.engine = engine
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.capacity = workers * PENDING_PER_WORKER  # Raw pages the parsers may fall behind by
+        self.queue = queue.Queue(maxsize=self.capacity)
+        self.parsed = 0
+        self._collector = threading.Thread(target=self._collect, name="parse-collector", daemon=True)
+        self._collector.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _record(self, records, seconds):
+        label = f"listing_{self.engine}"
+        metrics.PARSE_SECONDS.observe(seconds, parser=label)
+        metrics.PARSED_ROWS.inc(len(records), parser=label)
+
+    # Fire and forget; blocks while the parsers are PENDING_PER_WORKER pages behind
+    def submit(self, page, page_source):
+        future = self.executor.submit(_parse, page_source, self.engine)
+        self.queue.put((page, future))
+        metrics.QUEUE_DEPTH.set(self.queue.qsize(), queue="parse_pipeline")
+
+    # Parse now, off the GIL: the calling thread only waits
+    def parse(self, page_source):
+        records, seconds = self.executor.submit(_parse, page_source, self.engine).result()
+        self._record(records, seconds)
+        return records
+
+    async def parse_async(self, page_source):
+        future = self.executor.submit(_parse, page_source, self.engine)
+        records, seconds = await asyncio.wrap_future(future)
+        self._record(records, seconds)
+        return records
+
+    def _collect(self):
+        while (item := self.queue.get()) is not None:
+            page, future = item
+            try:
+                records, seconds = future.result()
+            except Exception as e:
+                print(f"❌ Parser error on page {page}: {e}")
+                records = []
+            else:
+                self._record(records, seconds)
+                self.parsed += 1
+            self.on_records(page, records)
+
+    def close(self):
+        self.queue.put(None)
+        self._collector.join()
+        self.executor.shutdown(wait=True)
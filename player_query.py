@@ -0,0 +1,233 @@
+import argparse
+import heapq
+import json
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from player_table import load_players, read_feather
+from rating_engine import RATINGS_TABLE
+
+# Settings
+HOST = "127.0.0.1"
+PORT = 8765
+DEFAULT_K = 50
+MAX_K = 1000
+AGE_BANDS = [(0, 20, "U21"), (21, 24, "21-24"), (25, 28, "25-28"), (29, 32, "29-32"), (33, 99, "33+")]
+HEAP_MAX_CANDIDATES = 5000  # Smaller candidate sets use a heap; larger ones walk the presorted order
+NUMERIC_COLUMNS = ["Value", "Rating", "Potential", "Age", "rating", "percentile"]
+RATED_COLUMNS = ["rating", "percentile"]  # From the rating engine; only qualified players are ranked
+RESULT_COLUMNS = [
+    "Name", "Team", "Nationality", "Positions", "Age", "Rating", "Potential", "Value",
+    "league", "rating", "Player URL",
+]  # fmt: skip
+
+
+def age_band(age):
+    if pd.isna(age):
+        return None
+    for low, high, label in AGE_BANDS:
+        if low <= age <= high:
+            return label
+    return None
+
+
+# 📚 Player table plus the fbref ratings when they exist
+def load_query_table():
+    players = load_players()
+    if os.path.exists(RATINGS_TABLE) and "fbref_id" in players.columns:
+        ratings = read_feather(RATINGS_TABLE, ["player_id", "league", "rating", "percentile", "qualified"])
+        players = players.merge(
+            ratings.rename(columns={"player_id": "fbref_id"}), on="fbref_id", how="left"
+        )
+    return players
+
+
+# 🗂️ Row positions per filter value and one presorted order per numeric column
+class PlayerIndex:
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self.size = len(self.df)
+        self.filters = {}
+
+        for name, column in [("nationality", "Nationality"), ("team", "Team")]:
+            if column in self.df.columns:
+                self.filters[name] = self._group(self.df[column].astype(object))
+        if "Age" in self.df.columns:
+            self.filters["age_band"] = self._group(self.df["Age"].astype(object).map(age_band))
+        if "Position List" in self.df.columns:
+            # "AM (R)" is found under "AM (R)" and under "AM"
+            exploded = self.df["Position List"].explode()
+            tokens = pd.concat([exploded, exploded.str.split(" ").str[0]])
+            tokens = tokens[tokens.notna()]
+            self.filters["position"] = {
+                key: np.unique(rows.to_numpy())
+                for key, rows in pd.Series(tokens.index, index=tokens.to_numpy()).groupby(level=0)
+            }
+
+        # Players under the rating engine's MIN_MINUTES have no rating or percentile to rank by
+        qualified = None
+        if "qualified" in self.df.columns:
+            qualified = self.df["qualified"].astype(object).eq(True).to_numpy()
+
+        self.values = {}
+        self.order = {}
+        for column in NUMERIC_COLUMNS:
+            if column in self.df.columns:
+                values = self.df[column].to_numpy(dtype="float64", na_value=np.nan)
+                if column in RATED_COLUMNS and qualified is not None:
+                    values = np.where(qualified, values, np.nan)
+                self.values[column] = values
+                # Descending; rows without a value never make a leaderboard
+                present = np.flatnonzero(~np.isnan(values))
+                self.order[column] = present[np.argsort(-values[present], kind="stable")]
+
+    @staticmethod
+    def _group(series):
+        series = series[series.notna()]
+        return {key: rows for key, rows in series.groupby(series).indices.items()}
+
+    def _key(self, name, value):
+        index = self.filters.get(name, {})
+        if value in index:
+            return value
+        # Case-insensitive fallback for hand-typed queries
+        lowered = str(value).casefold()
+        return next((k for k in index if str(k).casefold() == lowered), None)
+
+    # 🔍 Row positions matching every given filter; None means no filter
+    def candidates(self, **filters):
+        rows = None
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name not in self.filters:
+                raise ValueError(f"Unknown filter: {name}")
+            key = self._key(name, value)
+            matched = self.filters[name][key] if key is not None else np.array([], dtype=int)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+        return rows
+
+    # 🏆 Top k rows by a numeric column, without sorting the table
+    def top(self, by="Value", k=DEFAULT_K, ascending=False, **filters):
+        if by not in self.values:
+            raise ValueError(f"Not a numeric column: {by}")
+        k = max(0, min(int(k), MAX_K))
+        values = self.values[by]
+        rows = self.candidates(**filters)
+
+        if rows is not None and len(rows) <= HEAP_MAX_CANDIDATES:
+            rows = rows[~np.isnan(values[rows])]
+            pick = heapq.nsmallest if ascending else heapq.nlargest
+            picked = pick(k, rows.tolist(), key=values.__getitem__)
+        else:
+            order = self.order[by][::-1] if ascending else self.order[by]
+            if rows is not None:
+                mask = np.zeros(self.size, dtype=bool)
+                mask[rows] = True
+                order = order[mask[order]]
+            picked = order[:k].tolist()
+
+        columns = [c for c in RESULT_COLUMNS if c in self.df.columns]
+        return self.df.iloc[picked][columns]
+
+
+def to_records(frame):
+    return json.loads(frame.to_json(orient="records", force_ascii=False))
+
+
+# 🌐 GET /top?by=Rating&nationality=France&position=AM&age_band=U21&k=20[&asc=1]
+def make_handler(index):
+    class QueryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                if url.path == "/top":
+                    by, k = params.pop("by", "Value"), params.pop("k", DEFAULT_K)
+                    ascending = params.pop("asc", "0") == "1"
+                    # Everything else must be a filter; "ascending=1" or "foo=1" would reach top() as kwargs
+                    unknown = sorted(set(params) - set(index.filters))
+                    if unknown:
+                        raise ValueError(f"Unknown parameter: {', '.join(unknown)}")
+                    start = time.perf_counter()
+                    frame = index.top(by=by, k=k, ascending=ascending, **params)
+                    body = {
+                        "took_ms": round((time.perf_counter() - start) * 1000, 3),
+                        "players": to_records(frame),
+                    }
+                elif url.path == "/filters":
+                    body = {name: sorted(map(str, values)) for name, values in index.filters.items()}
+                else:
+                    return self._send(404, {"error": "use /top or /filters"})
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+            self._send(200, body)
+
+        def _send(self, status, body):
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return QueryHandler
+
+
+def serve(index, host=HOST, port=PORT):
+    server = ThreadingHTTPServer((host, port), make_handler(index))
+    print(f"🌐 Serving {index.size} players on http://{host}:{port}/top")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# 🚀 Main Execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filtered player leaderboards")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = sub.add_parser("serve", help="answer /top queries over HTTP")
+    serve_parser.add_argument("--host", default=HOST)
+    serve_parser.add_argument("--port", type=int, default=PORT)
+
+    top_parser = sub.add_parser("top", help="print one leaderboard")
+    top_parser.add_argument("--by", default="Value")
+    top_parser.add_argument("-k", type=int, default=DEFAULT_K)
+    top_parser.add_argument("--asc", action="store_true")
+    top_parser.add_argument("--nationality")
+    top_parser.add_argument("--team")
+    top_parser.add_argument("--position")
+    top_parser.add_argument("--age-band", choices=[label for _, _, label in AGE_BANDS])
+    args = parser.parse_args()
+
+    start = time.time()
+    index = PlayerIndex(load_query_table())
+    print(f"📚 Indexed {index.size} players in {time.time() - start:.2f}s")
+
+    if args.command == "serve":
+        serve(index, args.host, args.port)
+    else:
+        start = time.perf_counter()
+        frame = index.top(
+            by=args.by,
+            k=args.k,
+            ascending=args.asc,
+            nationality=args.nationality,
+            team=args.team,
+            position=args.position,
+            age_band=args.age_band,
+        )
+        print(frame.to_string(index=False))
+        print(f"⏱️ {(time.perf_counter() - start) * 1000:.2f} ms")
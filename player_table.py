@@ -0,0 +1,192 @@
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from fbref_store import STORE_ROOT, read_table, strip_link, table_ids
+
+# Settings
+PLAYERS_CSV = "all_players_ratings.csv"
+PLAYER_TABLE = "all_players_ratings.feather"
+STATS_DIR = "fbref_feather"  # One Feather file per fbref table_id
+CATEGORY_COLUMNS = ["Team", "Team Link", "Nationality", "Positions", "Primary Position"]
+FLOAT32_COLUMNS = ["Rating", "Potential", "Value"]
+INT16_COLUMNS = ["Age"]
+STATS_CATEGORY_MAX_RATIO = 0.5  # Text stats columns become categoricals below this unique/rows ratio
+STATS_KEY_COLUMNS = ["player_id", "player_name", "season"]
+
+FBREF_ID_RE = re.compile(r"/en/players/([0-9a-f]{8})/")
+
+
+# "M, AM (R)" → ("M", "AM (R)")
+def parse_positions(value):
+    if not isinstance(value, str):
+        return ()
+    return tuple(p.strip() for p in value.split(",") if p.strip())
+
+
+# Parsed once per distinct Positions value; rows share the same tuple
+def position_lists(positions):
+    parsed = np.empty(len(positions.cat.categories) + 1, dtype=object)
+    parsed[:] = [parse_positions(c) for c in positions.cat.categories] + [()]
+    # Code -1 (missing) picks the trailing empty tuple
+    return pd.Series(parsed[positions.cat.codes], index=positions.index, name="Position List")
+
+
+# "1,234" / "90 (https://...)" / "" → float, NaN when it is not a number
+def to_number(series):
+    cleaned = series.map(strip_link).astype("string").str.replace(",", "", regex=False)
+    return pd.to_numeric(cleaned, errors="coerce")
+
+
+def fbref_id(url):
+    found = FBREF_ID_RE.search(url) if isinstance(url, str) else None
+    return found.group(1) if found else None
+
+
+def _is_stale(path, source):
+    return not os.path.exists(path) or (
+        os.path.exists(source) and os.path.getmtime(source) > os.path.getmtime(path)
+    )
+
+
+# Uncompressed Feather so readers can memory-map it instead of decoding it
+def write_feather(df, path):
+    tmp_path = path + ".tmp"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def read_feather(path, columns=None):
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+# 🧱 Typed player table from the ratings CSV
+def build_player_table(csv_path=PLAYERS_CSV, out_path=PLAYER_TABLE):
+    df = pd.read_csv(csv_path, dtype=str)
+    df = df.loc[:, ~df.columns.str.startswith("Unnamed:")]
+
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    for col in INT16_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int16")
+
+    if "Positions" in df.columns:
+        df["Primary Position"] = df["Positions"].map(lambda p: (parse_positions(p) or (None,))[0])
+    if "fbref_url" in df.columns:
+        df["fbref_id"] = df["fbref_url"].map(fbref_id)
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    write_feather(df, out_path)
+    return df
+
+
+# 📦 Canonical loader: rebuilt when the CSV is newer, otherwise memory-mapped
+def load_players(path=PLAYER_TABLE, columns=None, csv_path=PLAYERS_CSV):
+    if _is_stale(path, csv_path):
+        build_player_table(csv_path, path)
+    df = read_feather(path, columns)
+    if "Positions" in df.columns:
+        df["Position List"] = position_lists(df["Positions"])
+    return df
+
+
+def stats_path(table_id, stats_dir=STATS_DIR):
+    return os.path.join(stats_dir, f"{table_id}.feather")
+
+
+# Numbers as float32, repeated text as categoricals
+def typed_stats(df):
+    for col in df.columns:
+        if col in STATS_KEY_COLUMNS or col == "scraped_at":
+            continue
+        values = df[col].map(lambda v: strip_link(v) or None)  # Empty cells are missing, not text
+        numbers = to_number(values)
+        if numbers.notna().sum() == values.notna().sum():
+            df[col] = numbers.astype("float32")
+        elif values.nunique() <= STATS_CATEGORY_MAX_RATIO * len(values):
+            df[col] = values.astype("category")
+        else:
+            df[col] = values.astype("string")
+    df["player_id"] = df["player_id"].astype("category")
+    return df
+
+
+# 🧱 Typed copy of one fbref_store table
+def build_stats_table(table_id, root=STORE_ROOT, stats_dir=STATS_DIR):
+    df = read_table(table_id, root=root)
+    if df.empty:
+        return df
+    df = typed_stats(df)
+    os.makedirs(stats_dir, exist_ok=True)
+    write_feather(df, stats_path(table_id, stats_dir))
+    return df
+
+
+def load_stats(table_id, columns=None, root=STORE_ROOT, stats_dir=STATS_DIR):
+    path = stats_path(table_id, stats_dir)
+    partition = os.path.join(root, f"table_id={table_id}")
+    if _is_stale(path, partition):
+        if build_stats_table(table_id, root, stats_dir).empty:
+            return pd.DataFrame()
+    if columns is not None:
+        names = feather.read_table(path, memory_map=True).schema.names
+        columns = [c for c in dict.fromkeys([*STATS_KEY_COLUMNS, *columns]) if c in names]
+    return read_feather(path, columns)
+
+
+# A few players straight from the store, typed the same way, without rebuilding the whole copy
+def player_stats(table_id, player_ids, columns=None, root=STORE_ROOT):
+    if columns is not None:
+        columns = list(dict.fromkeys([*STATS_KEY_COLUMNS, *columns]))
+    df = read_table(table_id, columns=columns, player_ids=player_ids, root=root)
+    return typed_stats(df) if not df.empty else df
+
+
+# 🔗 Player table joined with one or more stats tables on the fbref player id
+def load_joined(stats_tables, player_columns=None, stats_columns=None):
+    players = load_players(columns=player_columns and list(dict.fromkeys([*player_columns, "fbref_id"])))
+    for table_id in stats_tables:
+        stats = load_stats(table_id, stats_columns)
+        if stats.empty:
+            continue
+        stats = stats.drop(columns=["player_name"], errors="ignore").add_prefix(f"{table_id}.")
+        players = players.merge(
+            stats, left_on="fbref_id", right_on=f"{table_id}.player_id", how="left"
+        ).drop(columns=[f"{table_id}.player_id"])
+    return players
+
+
+if __name__ == "__main__":
+    # python player_table.py [ratings_csv]  → rebuild every Feather file and compare with the CSV
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else PLAYERS_CSV
+
+    start = time.time()
+    raw = pd.read_csv(csv_path)
+    csv_seconds = time.time() - start
+    csv_mb = raw.memory_usage(deep=True).sum() / 1024**2
+
+    build_player_table(csv_path, PLAYER_TABLE)
+    for table_id in table_ids():
+        build_stats_table(table_id)
+
+    start = time.time()
+    players = load_players(csv_path=csv_path)
+    load_seconds = time.time() - start
+    # Position List rows point at shared tuples; deep=True would count each one again
+    table_mb = players.drop(columns="Position List").memory_usage(deep=True).sum() / 1024**2
+
+    print(f"CSV:     {csv_seconds:.2f}s, {csv_mb:.1f} MB")
+    print(f"Feather: {load_seconds:.2f}s, {table_mb:.1f} MB → {PLAYER_TABLE}")
@@ -0,0 +1,290 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import metrics
+import page_cache
+
+# Settings
+PROXIES_FILE = "proxies.txt"  # One proxy URL per line; PROXIES="url1,url2" in the environment wins
+TEST_URL = "https://httpbin.org/ip"
+CHECK_TIMEOUT_SECONDS = 5
+CHECK_EVERY_SECONDS = 60  # Background health check of the whole pool
+CHECK_WORKERS = 32
+WINDOW = 50  # Rolling results kept per proxy
+MIN_SAMPLES = 5  # Results needed before the failure rate can evict
+EVICT_FAILURE_RATE = 0.5
+EVICT_CONSECUTIVE_FAILURES = 3
+COOLDOWN_SECONDS = 120  # Evicted proxies are re-checked after this, doubling per failed re-check
+MAX_COOLDOWN_SECONDS = 3600
+LATENCY_ALPHA = 0.2  # EWMA weight of the newest latency sample
+THROTTLE_STATUSES = {403, 407, 418, 429}  # Answers that mean "this egress IP is burnt"
+
+PROXIES_HEALTHY = metrics.gauge("scraper_proxies_healthy", "Proxies currently handed out")
+PROXIES_EVICTED = metrics.gauge("scraper_proxies_evicted", "Proxies cooling down after failures")
+
+
+class NoProxyAvailable(Exception):
+    pass
+
+
+# 📈 Rolling health of one proxy
+class ProxyState:
+    def __init__(self, url):
+        self.url = url
+        self.results = deque(maxlen=WINDOW)
+        self.latency = None
+        self.consecutive_failures = 0
+        self.in_flight = 0
+        self.evicted_until = None
+        self.cooldown = COOLDOWN_SECONDS
+        self.ip = None
+
+    @property
+    def failure_rate(self):
+        return self.results.count(False) / len(self.results) if self.results else 0.0
+
+    # Success rate over latency; an unchecked proxy starts at a neutral 1 s
+    def score(self):
+        success = 1 - self.failure_rate
+        latency = self.latency if self.latency is not None else 1.0
+        return success / (0.1 + latency)
+
+    def record(self, ok, latency=None):
+        self.results.append(ok)
+        if ok:
+            self.consecutive_failures = 0
+            if latency is not None:
+                self.latency = latency if self.latency is None else (
+                    LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self.latency
+                )
+        else:
+            self.consecutive_failures += 1
+
+    # A proxy that never worked goes on its first failure
+    def should_evict(self):
+        return (
+            True not in self.results
+            or self.consecutive_failures >= EVICT_CONSECUTIVE_FAILURES
+            or (len(self.results) >= MIN_SAMPLES and self.failure_rate >= EVICT_FAILURE_RATE)
+        )
+
+
+# 🧦 Scored, self-healing set of egress proxies shared by every fetcher in the process
+class ProxyPool:
+    def __init__(self, proxies, test_url=TEST_URL, timeout=CHECK_TIMEOUT_SECONDS):
+        self.test_url = test_url
+        self.timeout = timeout
+        self.states = {url: ProxyState(url) for url in dict.fromkeys(proxies)}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._checker = None
+
+    def _healthy(self):
+        return [s for s in self.states.values() if s.evicted_until is None]
+
+    # 🎲 Weighted by score and spread by in-flight count, so one fast proxy is not hammered
+    def acquire(self):
+        with self._lock:
+            healthy = self._healthy()
+            if not healthy:
+                raise NoProxyAvailable(f"All {len(self.states)} proxies are evicted")
+            weights = [s.score() / (1 + s.in_flight) for s in healthy]
+            state = random.choices(healthy, weights=weights)[0] if sum(weights) > 0 else random.choice(healthy)
+            state.in_flight += 1
+            return state.url
+
+    # None instead of raising: the caller goes direct while every proxy cools down
+    def try_acquire(self):
+        try:
+            return self.acquire()
+        except NoProxyAvailable:
+            return None
+
+    def is_healthy(self, proxy):
+        return self.states[proxy].evicted_until is None
+
+    # Outcome of one request; long-lived leases (browsers) report many times
+    def report(self, proxy, ok, latency=None):
+        with self._lock:
+            self._record(self.states[proxy], ok, latency)
+
+    # Hand a proxy back; ok=None when it was never actually used (cache hit)
+    def release(self, proxy, ok=None, latency=None):
+        with self._lock:
+            state = self.states[proxy]
+            state.in_flight = max(0, state.in_flight - 1)
+            if ok is not None:
+                self._record(state, ok, latency)
+
+    def _record(self, state, ok, latency):
+        state.record(ok, latency)
+        if state.evicted_until is None and state.should_evict():
+            state.evicted_until = time.time() + state.cooldown
+            print(
+                f"🧦 Evicted {state.url} ({state.failure_rate:.0%} failures, "
+                f"{state.consecutive_failures} in a row), re-check in {state.cooldown}s"
+            )
+        self._update_gauges()
+
+    def _update_gauges(self):
+        PROXIES_HEALTHY.set(len(self._healthy()))
+        PROXIES_EVICTED.set(len(self.states) - len(self._healthy()))
+
+    # 🩺 One test request through one proxy
+    def check(self, proxy):
+        start = time.perf_counter()
+        try:
+            response = requests.get(self.test_url, proxies=requests_proxies(proxy), timeout=self.timeout)
+            ok = response.status_code == 200
+            ip = response.json().get("origin") if ok else None
+        except Exception:
+            ok, ip = False, None
+        return proxy, ok, time.perf_counter() - start, ip
+
+    # 🩺 All due proxies at once: healthy ones, and evicted ones whose cooldown ran out
+    def check_all(self, include_cooling=False):
+        now = time.time()
+        due = [
+            s.url
+            for s in self.states.values()
+            if s.evicted_until is None or include_cooling or s.evicted_until <= now
+        ]
+        if not due:
+            return []
+        with ThreadPoolExecutor(max_workers=min(CHECK_WORKERS, len(due))) as executor:
+            results = list(executor.map(self.check, due))
+
+        with self._lock:
+            for proxy, ok, latency, ip in results:
+                state = self.states[proxy]
+                if state.evicted_until is None:
+                    state.ip = ip or state.ip
+                    self._record(state, ok, latency if ok else None)
+                elif ok:
+                    # Re-admitted with a clean slate; it has to earn its history again
+                    state.results.clear()
+                    state.consecutive_failures = 0
+                    state.evicted_until = None
+                    state.cooldown = COOLDOWN_SECONDS
+                    state.ip = ip
+                    state.record(True, latency)
+                    print(f"🧦 Re-admitted {proxy} ({latency:.2f}s)")
+                else:
+                    state.cooldown = min(state.cooldown * 2, MAX_COOLDOWN_SECONDS)
+                    state.evicted_until = time.time() + state.cooldown
+            self._update_gauges()
+        return results
+
+    # 🕒 Background health checks until stop()
+    def start(self, every=CHECK_EVERY_SECONDS):
+        def loop():
+            while not self._stop.wait(every):
+                self.check_all()
+
+        self.check_all()
+        self._checker = threading.Thread(target=loop, name="proxy-pool-check", daemon=True)
+        self._checker.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    # 📋 (proxy, healthy, score, failure rate, latency, ip), best first
+    def table(self):
+        with self._lock:
+            rows = [
+                (s.url, s.evicted_until is None, s.score(), s.failure_rate, s.latency, s.ip)
+                for s in self.states.values()
+            ]
+        return sorted(rows, key=lambda row: (not row[1], -row[2]))
+
+
+# True/False for the proxy's score; None when the answer says nothing about it (origin 5xx)
+def healthy_status(status_code):
+    if status_code in THROTTLE_STATUSES:
+        return False
+    return None if status_code >= 500 else True
+
+
+# 🔌 Fetcher hooks
+def requests_proxies(proxy):
+    return {"http": proxy, "https": proxy}
+
+
+def selenium_options(options, proxy):
+    options.add_argument(f"--proxy-server={proxy}")
+    return options
+
+
+# Per-context proxy; the browser itself is launched without one, so a context without a proxy goes direct
+def playwright_proxy(proxy):
+    return {"server": proxy}
+
+
+def load_proxies(path=PROXIES_FILE):
+    if os.environ.get("PROXIES"):
+        return [p.strip() for p in os.environ["PROXIES"].split(",") if p.strip()]
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+# 🌐 page_cache.fetch through the best proxy; direct when no pool is configured
+def fetch(url, pool=None, **kwargs):
+    pool = pool or default_pool()
+    proxy = pool.try_acquire() if pool else None
+    if proxy is None:
+        return page_cache.fetch(url, **kwargs)
+    start = time.perf_counter()
+    try:
+        response = page_cache.fetch(url, proxies=requests_proxies(proxy), **kwargs)
+    except Exception:
+        pool.release(proxy, False)
+        raise
+    if response.from_cache:
+        pool.release(proxy)
+    else:
+        pool.release(proxy, healthy_status(response.status_code), time.perf_counter() - start)
+    return response
+
+
+# 🌐 Same for page_cache.fetch_async on an aiohttp session (HTTP proxies only)
+async def fetch_async(session, url, pool=None, **kwargs):
+    pool = pool or default_pool()
+    proxy = pool.try_acquire() if pool else None
+    if proxy is None:
+        return await page_cache.fetch_async(session, url, **kwargs)
+    start = time.perf_counter()
+    try:
+        response = await page_cache.fetch_async(session, url, proxy=proxy, **kwargs)
+    except Exception:
+        pool.release(proxy, False)
+        raise
+    if response.from_cache:
+        pool.release(proxy)
+    else:
+        pool.release(proxy, healthy_status(response.status_code), time.perf_counter() - start)
+    return response
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+# Shared pool, health-checked in the background; None when no proxies are configured
+def default_pool():
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            proxies = load_proxies()
+            if not proxies:
+                return None
+            _default_pool = ProxyPool(proxies).start()
+        return _default_pool
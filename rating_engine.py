@@ -0,0 +1,290 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from fbref_store import TableManifest
+from player_table import load_players, load_stats, player_stats, read_feather, write_feather
+
+# Settings
+OUTFIELD_TABLE = "stats_standard_dom_lg"
+KEEPER_TABLE = "stats_keeper_dom_lg"
+RATINGS_CSV = "fbref_ratings.csv"
+RATINGS_TABLE = "fbref_ratings.feather"
+RATINGS_STATE = "fbref_ratings.state.json"  # Store manifest version the ratings were computed from
+SEASONS_BACK = 3  # Most recent seasons that count towards a rating
+MIN_MINUTES = 900  # Minutes over the window needed to join the cohort statistics
+Z_CLIP = 4  # A 40-minute hat-trick should not outrank a full season
+KEEPER_MINUTES_SHARE = 0.5  # Share of league minutes in goal above which a player is rated as a keeper
+
+OUTFIELD_COUNTS = ["Gls", "Ast", "npxG", "xAG", "PrgC", "PrgP", "PrgR", "CrdY", "CrdR"]
+KEEPER_COUNTS = ["MP", "GA", "SoTA", "Saves", "CS", "PKatt", "PKsv"]
+
+# Per-90 metric weights by position group; a negative weight means lower is better
+WEIGHTS = {
+    "FW": {"npxG": 3, "Gls": 2, "xAG": 1.5, "Ast": 1, "PrgR": 1, "PrgC": 1},
+    "MF": {"xAG": 2, "PrgP": 2, "PrgC": 1.5, "Ast": 1, "npxG": 1, "PrgR": 0.5},
+    # The standard table has no tackles or interceptions: defenders are rated on progression and discipline
+    "DF": {"PrgP": 2, "PrgC": 1.5, "xAG": 0.5, "npxG": 0.5, "CrdY": -0.5, "CrdR": -1},
+    "GK": {"save_pct": 3, "ga90": -2, "cs_rate": 1.5, "pk_save_pct": 0.5},
+}
+METRICS = list(dict.fromkeys(m for weights in WEIGHTS.values() for m in weights))
+WEIGHT_TABLE = pd.DataFrame(WEIGHTS).T.reindex(columns=METRICS).fillna(0)
+
+# footballtransfers "Primary Position" → position group
+POSITION_GROUPS = {"GK": "GK", "D": "DF", "WB": "DF", "DM": "MF", "M": "MF", "AM": "MF", "F": "FW"}
+CONTEXT_COLUMNS = ["player_name", "position_group", "league", "squad", "season", "minutes"]
+METRIC_COLUMNS = CONTEXT_COLUMNS + METRICS
+
+
+def position_group(position):
+    if not isinstance(position, str):
+        return None
+    return POSITION_GROUPS.get(position.split(" ")[0])
+
+
+# 📋 League rows of the last SEASONS_BACK seasons per player
+def season_rows(table_id, counts, player_ids=None):
+    columns = ["Squad", "Comp", "Min", *counts]
+    if player_ids is None:
+        rows = load_stats(table_id, columns)
+    else:
+        rows = player_stats(table_id, player_ids, columns)
+    if rows.empty:
+        return rows
+    rows = rows[rows["Comp"].notna() & (rows["Min"] > 0)].copy()
+    rows["player_id"] = rows["player_id"].astype(str)
+    for col in counts:
+        if col not in rows.columns:
+            rows[col] = np.nan
+
+    # "2023-2024" and "2024" both sort by their first year
+    season_rank = rows.groupby("player_id")["season"].rank(method="dense", ascending=False)
+    return rows[season_rank <= SEASONS_BACK].sort_values(["player_id", "season"])
+
+
+# ➕ Window totals per player; each count only uses the minutes of seasons that report it
+def window_totals(rows, counts):
+    values = rows[counts].to_numpy(dtype="float64")
+    reported = ~np.isnan(values)
+    minutes = rows["Min"].to_numpy(dtype="float64")[:, None] * reported
+
+    keys = rows["player_id"].to_numpy()
+    totals = pd.DataFrame(np.where(reported, values, 0), columns=counts).groupby(keys).sum()
+    minutes = pd.DataFrame(minutes, columns=counts).groupby(keys).sum()
+    counted = pd.DataFrame(reported, columns=counts).groupby(keys).any()
+    return totals.where(counted), minutes
+
+
+# Latest league row per player: league, squad and season shown next to the rating
+def latest_context(rows):
+    latest = rows.drop_duplicates("player_id", keep="last").set_index("player_id")
+    return pd.DataFrame(
+        {
+            "player_name": latest["player_name"],
+            "league": latest["Comp"].astype(str).str.replace(r"^\d+\.\s*", "", regex=True),
+            "squad": latest["Squad"].astype(str),
+            "season": latest["season"],
+        }
+    )
+
+
+# 🏃 Per-90 metrics for outfield players
+def outfield_metrics(player_ids=None):
+    rows = season_rows(OUTFIELD_TABLE, OUTFIELD_COUNTS, player_ids)
+    if rows.empty:
+        return pd.DataFrame()
+    totals, minutes = window_totals(rows, OUTFIELD_COUNTS)
+    metrics = totals / minutes.replace(0, np.nan) * 90
+    metrics["minutes"] = rows.groupby("player_id")["Min"].sum()
+    return latest_context(rows).join(metrics)
+
+
+# 🧤 Rate metrics for goalkeepers
+def keeper_metrics(player_ids=None):
+    rows = season_rows(KEEPER_TABLE, KEEPER_COUNTS, player_ids)
+    if rows.empty:
+        return pd.DataFrame()
+    totals, minutes = window_totals(rows, KEEPER_COUNTS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics = pd.DataFrame(
+            {
+                "save_pct": totals["Saves"] / totals["SoTA"].replace(0, np.nan),
+                "ga90": totals["GA"] / minutes["GA"].replace(0, np.nan) * 90,
+                "cs_rate": totals["CS"] / totals["MP"].replace(0, np.nan),
+                "pk_save_pct": totals["PKsv"] / totals["PKatt"].replace(0, np.nan),
+            }
+        )
+    metrics["minutes"] = rows.groupby("player_id")["Min"].sum()
+    return latest_context(rows).join(metrics)
+
+
+# 🧩 Outfield + keeper metrics with a position group per player
+def player_metrics(player_ids=None):
+    players = load_players(columns=["fbref_id", "Primary Position"]).dropna(subset=["fbref_id"])
+    groups = (
+        players.drop_duplicates("fbref_id")
+        .set_index("fbref_id")["Primary Position"]
+        .astype(object)
+        .map(position_group)
+    )
+
+    outfield = outfield_metrics(player_ids)
+    keepers = keeper_metrics(player_ids)
+    if not keepers.empty:
+        # A keeper is listed as GK or played most league minutes in goal, not an outfielder who filled in
+        league_minutes = (
+            outfield["minutes"].reindex(keepers.index).fillna(0) if not outfield.empty else 0
+        )
+        in_goal = keepers["minutes"] > KEEPER_MINUTES_SHARE * league_minutes
+        listed = groups.reindex(keepers.index).eq("GK")
+        keepers = keepers[in_goal | listed].copy()
+        keepers["position_group"] = "GK"
+    if not outfield.empty:
+        outfield["position_group"] = groups.reindex(outfield.index)
+        outfield = outfield[outfield["position_group"].isin(["DF", "MF", "FW"])]
+        outfield = outfield.drop(index=keepers.index, errors="ignore")
+
+    metrics = pd.concat([outfield, keepers]).reindex(columns=METRIC_COLUMNS)
+    metrics.index.name = "player_id"
+    return metrics
+
+
+# 📊 Mean and standard deviation of every metric over each group's qualified players
+def cohort_stats(metrics):
+    qualified = metrics[metrics["minutes"] >= MIN_MINUTES]
+    grouped = qualified.groupby("position_group")[METRICS]
+    return grouped.mean(), grouped.std(ddof=0), qualified.groupby("position_group").size()
+
+
+# 🏅 Position-relative z-scores, composite and percentile for every player at once
+def score(metrics, cohorts):
+    means, stds, _ = cohorts
+    group = metrics["position_group"]
+    mean = means.reindex(group).to_numpy()
+    std = stds.reindex(group).to_numpy()
+    values = metrics[METRICS].to_numpy(dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.clip((values - mean) / np.where(std > 0, std, np.nan), -Z_CLIP, Z_CLIP)
+
+    weights = WEIGHT_TABLE.reindex(group).fillna(0).to_numpy()
+    # A missing metric counts as average for its group
+    composite = (np.nan_to_num(z) * weights).sum(axis=1) / np.abs(weights).sum(axis=1)
+
+    ratings = metrics[CONTEXT_COLUMNS].copy()
+    ratings[METRICS] = metrics[METRICS]
+    ratings[[f"z_{m}" for m in METRICS]] = np.where(weights != 0, z, np.nan)
+    ratings["composite"] = composite
+    ratings["qualified"] = metrics["minutes"] >= MIN_MINUTES
+    # Too few minutes for a trustworthy rate: the metrics stay, the rating does not
+    ratings["rating"] = (50 + 10 * ratings["composite"]).where(ratings["qualified"])
+    ratings["percentile"] = percentiles(ratings)
+    return ratings
+
+
+# Share of the group's qualified players with a lower composite, for qualified players only
+def percentiles(ratings):
+    result = pd.Series(np.nan, index=ratings.index)
+    for group, members in ratings[ratings["qualified"]].groupby("position_group"):
+        cohort = np.sort(members["composite"].to_numpy())
+        below = np.searchsorted(cohort, members["composite"].to_numpy(), side="left")
+        result.loc[members.index] = 100 * below / len(cohort)
+    return result
+
+
+def write_ratings(ratings, csv_path=RATINGS_CSV, table_path=RATINGS_TABLE):
+    ratings = ratings.sort_values(["qualified", "composite"], ascending=False)
+    ratings.to_csv(csv_path)
+    write_feather(ratings.reset_index(), table_path)
+
+
+def load_state(path=RATINGS_STATE):
+    if not os.path.exists(path) or not os.path.exists(RATINGS_TABLE):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(version, path=RATINGS_STATE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "rated_at": time.time()}, f)
+    os.replace(tmp_path, path)
+
+
+# 🚀 Main Execution
+def rate_all():
+    start = time.time()
+    # Read the version first: anything stored during the run is picked up next time
+    manifest = TableManifest()
+    try:
+        version = manifest.version()
+    finally:
+        manifest.close()
+    metrics = player_metrics()
+    ratings = score(metrics, cohort_stats(metrics))
+    write_ratings(ratings)
+    save_state(version)
+    print(
+        f"✅ Rated {len(ratings)} players ({ratings['qualified'].sum()} qualified) "
+        f"in {time.time() - start:.2f}s → {RATINGS_CSV}"
+    )
+    return ratings
+
+
+# 🔁 Only players whose tables changed since the last run, plus the cohorts they belong to
+def rate_changed():
+    state = load_state()
+    if state is None:
+        return rate_all()
+
+    start = time.time()
+    manifest = TableManifest()
+    try:
+        version = manifest.version()
+        dirty = manifest.changed_since(state["version"], [OUTFIELD_TABLE, KEEPER_TABLE])
+    finally:
+        manifest.close()
+    previous = read_feather(RATINGS_TABLE).set_index("player_id")
+    if not dirty:
+        print("✅ No fbref table changed since the last rating run")
+        save_state(version)
+        return previous
+
+    fresh = player_metrics(dirty)
+    metrics = pd.concat([previous.drop(index=list(dirty), errors="ignore")[METRIC_COLUMNS], fresh])
+    metrics.index.name = "player_id"
+
+    # A changed player moves the mean and spread of their old and new group; other groups keep their scores
+    affected = set(previous.reindex(list(dirty))["position_group"].dropna()) | set(
+        fresh["position_group"].dropna()
+    )
+    in_affected = metrics["position_group"].isin(affected)
+    rescored = score(metrics[in_affected], cohort_stats(metrics[in_affected]))
+    kept = previous[~previous["position_group"].isin(affected)]
+    ratings = pd.concat([kept, rescored])
+    ratings.index.name = "player_id"
+
+    write_ratings(ratings)
+    save_state(version)
+    print(
+        f"✅ Re-rated {len(fresh)} changed players, rescored groups {sorted(affected)} "
+        f"in {time.time() - start:.2f}s → {RATINGS_CSV}"
+    )
+    return ratings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rate players from the stored fbref tables")
+    parser.add_argument("--full", action="store_true", help="recompute every player")
+    parser.add_argument("--top", type=int, default=0, help="print the top N per position group")
+    args = parser.parse_args()
+
+    ratings = rate_all() if args.full else rate_changed()
+    if args.top:
+        for group, members in ratings[ratings["qualified"]].groupby("position_group"):
+            print(f"\n{group}")
+            print(members.nlargest(args.top, "composite")[["player_name", "squad", "league", "rating", "percentile"]])
@@ -0,0 +1,84 @@
+import csv
+import os
+
+import pandas as pd
+
+# Settings
+ROW_KEY_COLUMN = "Player URL"  # Stable per-player key (row order is shuffled/sorted by the resolvers)
+URL_COLUMN = "fbref_url"
+FSYNC_EVERY = 50  # Resolved rows written between fsyncs
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+# 📝 Append-only (row key, fbref_url) log, cheap no matter how big the table is
+class ResolutionJournal:
+    def __init__(self, path, fsync_every=FSYNC_EVERY):
+        self.path = path
+        self.fsync_every = fsync_every
+        self._file = open(path, "a", encoding="utf-8", newline="")
+        if self._file.tell() > 0 and not _ends_with_newline(path):
+            self._file.write("\r\n")  # Isolate a torn line left by a crash
+        self._writer = csv.writer(self._file)
+        self._unsynced = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, key, fbref_url):
+        self._writer.writerow([key, fbref_url])
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+
+def load_journal(path):
+    resolved = {}
+    if not os.path.exists(path):
+        return resolved
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) == 2:  # A torn last line from a crash is ignored
+                resolved[row[0]] = row[1]
+    return resolved
+
+
+# Fill url_column from the journal, in place
+def apply_journal(df, resolved, key_column=ROW_KEY_COLUMN, url_column=URL_COLUMN):
+    if url_column not in df.columns:
+        df[url_column] = None
+    if resolved:
+        found = df[key_column].map(resolved)
+        df[url_column] = found.where(found.notna(), df[url_column])
+    return df
+
+
+# 🧹 Merge the journal into the master CSV (atomic replace), then start a new journal
+def compact(csv_path, journal_path, key_column=ROW_KEY_COLUMN, url_column=URL_COLUMN):
+    resolved = load_journal(journal_path)
+    if not resolved:
+        return 0
+
+    df = apply_journal(pd.read_csv(csv_path), resolved, key_column, url_column)
+    tmp_path = csv_path + ".tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, csv_path)
+    os.remove(journal_path)
+    return len(resolved)
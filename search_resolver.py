@@ -0,0 +1,173 @@
+import asyncio
+import html
+import re
+import time
+
+import metrics
+import page_cache
+import site_urls
+
+# Configuration
+DUCKDUCKGO_SEARCH = site_urls.DUCKDUCKGO + "/?q=site%3Afbref.com+"
+FBREF_LINK_RE = re.compile(r'href="([^"]*fbref\.com/en/players/[^"]*)"')
+NUM_LANES = 4  # Tabs searching in parallel
+START_RATE = 1.0  # Searches per second, shared by all lanes
+MIN_RATE = 0.05
+MAX_RATE = 4.0
+RATE_STEP = 0.1  # Additive step for both slowing down and recovering
+SUCCESSES_PER_STEP = 20  # Clean searches in a row before the rate goes back up
+LANE_COOLDOWN_SECONDS = 60  # Doubles per consecutive error on the same lane
+MAX_LANE_COOLDOWN_SECONDS = 3600
+RETRY_ATTEMPTS = 4
+RESULTS_TIMEOUT_MS = 3000
+THROTTLE_STATUSES = {418, 429}
+
+
+class Throttled(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+# 🪣 Global token bucket with additive rate adjustment
+class TokenBucket:
+    def __init__(self, rate=None, capacity=1):
+        self.rate = rate or START_RATE
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = None
+        self._streak = 0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    elapsed = now - self._updated
+                    self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def record_success(self):
+        self._streak += 1
+        if self._streak >= SUCCESSES_PER_STEP:
+            self._streak = 0
+            self.rate = min(MAX_RATE, self.rate + RATE_STEP)
+
+    def slow_down(self):
+        self._streak = 0
+        self.rate = max(MIN_RATE, self.rate - RATE_STEP)
+
+
+def search_url(name, club):
+    query = f"{name} {club} fbref profile".replace(" ", "+")
+    return DUCKDUCKGO_SEARCH + query + "&ia=web"
+
+
+# First fbref player link in a search results page
+def first_fbref_link(content):
+    found = FBREF_LINK_RE.search(content)
+    return html.unescape(found.group(1)) if found else None
+
+
+# By status code, not by digits that happen to be in an error message
+def is_throttle_error(error):
+    text = str(error)
+    return (
+        isinstance(error, (Throttled, asyncio.TimeoutError))
+        or getattr(error, "status", None) in THROTTLE_STATUSES
+        or "ERR_TIMED_OUT" in text
+        or "Timeout" in text
+    )
+
+
+# 🔎 One search on one tab → (match, content, from_cache); cached result pages cost no request
+async def search_player(tab, name, club, bucket):
+    url = search_url(name, club)
+    domain = metrics.domain(url)
+    content = page_cache.default_cache().get_text(url)
+    if content is not None:
+        metrics.CACHE_RESULTS.inc(domain=domain, result="hit")
+        return first_fbref_link(content), content, True
+
+    await bucket.acquire()
+    metrics.CACHE_RESULTS.inc(domain=domain, result="miss")
+    start = time.perf_counter()
+    response = await tab.goto(url, wait_until="domcontentloaded", timeout=10000)
+    metrics.FETCH_SECONDS.observe(time.perf_counter() - start, domain=domain)
+    metrics.FETCH_STATUS.inc(domain=domain, status=response.status if response is not None else "none")
+    if response is not None and response.status in THROTTLE_STATUSES:
+        raise Throttled(response.status)
+
+    try:
+        await tab.wait_for_selector(
+            "a[href*='fbref.com/en/players/']", timeout=RESULTS_TIMEOUT_MS
+        )
+    except Exception:
+        pass  # No fbref result on this page
+    content = await tab.content()
+    match = first_fbref_link(content)
+    if match:
+        # A page without a result may be a captcha or a half-rendered page: search again next run
+        page_cache.default_cache().put(url, content)
+    return match, content, False
+
+
+# 🚦 Drain (key, name, club) jobs with NUM_LANES lanes borrowing pages from a BrowserPool
+async def resolve_players(pool, players, on_result, num_lanes=NUM_LANES, log=print):
+    queue = asyncio.Queue()
+    for key, name, club in players:
+        queue.put_nowait((key, name, club, 0))
+    bucket = TokenBucket()
+
+    async def lane(lane_id):
+        cooldown = LANE_COOLDOWN_SECONDS
+        # Runs until the None sentinel: a retry can be queued while this lane would see an empty queue
+        while (job := await queue.get()) is not None:
+            key, name, club, attempt = job
+            metrics.QUEUE_DEPTH.set(queue.qsize(), queue="search_resolver")
+            try:
+                # A failing search hands its context back to be recycled (fresh cookies)
+                async with pool.page() as tab:
+                    match, content, from_cache = await search_player(tab, name, club, bucket)
+            except Exception as e:
+                if attempt + 1 < RETRY_ATTEMPTS:
+                    metrics.FETCH_RETRIES.inc(stage="search_resolver")
+                    queue.put_nowait((key, name, club, attempt + 1))
+                else:
+                    log(f"Giving up on {name} ({club}) after {RETRY_ATTEMPTS} attempts")
+
+                if is_throttle_error(e):
+                    # Only this lane pauses; the others carry on at a lower shared rate
+                    bucket.slow_down()
+                    log(
+                        f"Lane {lane_id} throttled on {name} ({club}): {e} — "
+                        f"cooling down {cooldown}s, rate now {bucket.rate:.2f}/s"
+                    )
+                    await asyncio.sleep(cooldown)
+                    cooldown = min(cooldown * 2, MAX_LANE_COOLDOWN_SECONDS)
+                else:
+                    log(f"Error on {name} ({club}): {e}")
+            else:
+                if not from_cache:
+                    # Only live answers are evidence that the site accepts a higher rate
+                    bucket.record_success()
+                    cooldown = LANE_COOLDOWN_SECONDS
+                # Not a failed search to retry, and it must not kill the lane while queue.join() waits
+                try:
+                    on_result(key, name, club, match, content)
+                except Exception as e:
+                    log(f"Could not record the result for {name} ({club}): {e}")
+            finally:
+                queue.task_done()
+
+    lanes = [asyncio.create_task(lane(i)) for i in range(num_lanes)]
+    await queue.join()  # Every job done, retries included
+    for _ in lanes:
+        queue.put_nowait(None)
+    await asyncio.gather(*lanes)
@@ -0,0 +1,231 @@
+import argparse
+import hashlib
+import heapq
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from name_index import normalize_name
+from player_table import load_players, read_feather
+from rating_engine import RATINGS_TABLE, WEIGHTS, position_group
+
+# Settings
+LEAF_SIZE = 32  # Points per KD-tree leaf, searched with one vectorized distance
+DEFAULT_K = 10
+MARKET_FEATURES = ["Rating", "Potential", "Age", "log_value"]
+MARKET_WEIGHT = 1.0  # Relative weight of the footballtransfers block against the fbref per-90 block
+INFO_COLUMNS = ["Name", "Team", "Positions", "Age", "Rating", "Potential", "Value", "league", "Player URL"]
+
+
+# 🌳 Static KD-tree over one feature matrix, numpy only
+class KDTree:
+    def __init__(self, points, leaf_size=LEAF_SIZE):
+        n = len(points)
+        self.index = np.arange(n)
+        self.starts, self.ends, self.lefts, self.rights, self.los, self.his = [], [], [], [], [], []
+
+        stack = [(0, n, None)]
+        while stack:
+            start, end, parent_side = stack.pop()
+            node = len(self.starts)
+            if parent_side is not None:
+                parent, side = parent_side
+                (self.lefts if side == 0 else self.rights)[parent] = node
+            block = points[self.index[start:end]]
+            lo, hi = block.min(axis=0), block.max(axis=0)
+            self.starts.append(start)
+            self.ends.append(end)
+            self.los.append(lo)
+            self.his.append(hi)
+            self.lefts.append(-1)
+            self.rights.append(-1)
+
+            if end - start > leaf_size:
+                # Split the widest dimension at its median
+                dim = int(np.argmax(hi - lo))
+                mid = (end - start) // 2
+                order = np.argpartition(block[:, dim], mid)
+                self.index[start:end] = self.index[start:end][order]
+                stack.append((start + mid, end, (node, 1)))
+                stack.append((start, start + mid, (node, 0)))
+
+        # Leaf points stored contiguously in tree order
+        self.points = points[self.index]
+        self.los, self.his = np.array(self.los), np.array(self.his)
+
+    def _bound(self, node, query):
+        gap = np.maximum(self.los[node] - query, 0) + np.maximum(query - self.his[node], 0)
+        return float(gap @ gap)
+
+    # 🔍 k nearest (distance, row) pairs; mask[row] False means filtered out
+    def query(self, query, k, mask=None):
+        best = []  # Max-heap of (-distance, row)
+        frontier = [(self._bound(0, query), 0)]
+        while frontier:
+            bound, node = heapq.heappop(frontier)
+            if len(best) == k and bound >= -best[0][0]:
+                break
+            if self.lefts[node] < 0:
+                start, end = self.starts[node], self.ends[node]
+                rows = self.index[start:end]
+                block = self.points[start:end]
+                if mask is not None:
+                    keep = mask[rows]
+                    rows, block = rows[keep], block[keep]
+                distances = ((block - query) ** 2).sum(axis=1)
+                for distance, row in zip(distances.tolist(), rows.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, row))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, row))
+            else:
+                for child in (self.lefts[node], self.rights[node]):
+                    heapq.heappush(frontier, (self._bound(child, query), child))
+        return sorted((-d, row) for d, row in best)
+
+
+# 📚 Players with market values, fbref per-90 metrics and a position group
+def load_feature_table():
+    players = load_players()
+    players["log_value"] = np.log10(players["Value"].astype("float64").clip(lower=1))
+    players["group"] = players["Primary Position"].astype(object).map(position_group)
+
+    if os.path.exists(RATINGS_TABLE) and "fbref_id" in players.columns:
+        metrics = sorted({m for weights in WEIGHTS.values() for m in weights})
+        ratings = read_feather(RATINGS_TABLE, ["player_id", "position_group", "league", *metrics])
+        players = players.merge(
+            ratings.rename(columns={"player_id": "fbref_id"}), on="fbref_id", how="left"
+        )
+        # fbref's keeper minutes beat footballtransfers' label
+        players["group"] = players["position_group"].fillna(players["group"])
+    return players[players["group"].notna()].reset_index(drop=True)
+
+
+# Group-standardized features; a missing value sits at the group average
+def group_features(members, group):
+    fbref = [m for m in WEIGHTS[group] if m in members.columns]
+    blocks = []
+    for columns, weight in [(MARKET_FEATURES, MARKET_WEIGHT), (fbref, 1.0)]:
+        if not columns:
+            continue
+        values = members[columns].to_numpy(dtype="float64", na_value=np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # "Mean of empty slice" for a metric nobody has
+            mean, std = np.nanmean(values, axis=0), np.nanstd(values, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = (values - mean) / np.where(std > 0, std, np.nan)
+        # Each block counts the same however many columns it has
+        blocks.append(np.nan_to_num(z) * weight / np.sqrt(len(columns)))
+    return np.hstack(blocks)
+
+
+# 🧭 One KD-tree per position group, rebuilt only where the features changed
+class SimilarityIndex:
+    def __init__(self):
+        self.players = None
+        self.groups = {}  # group → (signature, rows, features, tree); rows are positions in self.players
+        self.lookup = {}
+        self.rebuilt = []
+
+    def refresh(self, players=None):
+        start = time.time()
+        self.players = players if players is not None else load_feature_table()
+        self.rebuilt = []
+        groups = {}
+        for group, rows in self.players.groupby("group").indices.items():
+            members = self.players.iloc[rows]
+            features = group_features(members, group)
+            # Row positions are part of it: an insert in another group shifts this group's rows too
+            signature = hashlib.sha1(
+                features.tobytes()
+                + rows.astype("int64").tobytes()
+                + members["Player URL"].astype(str).str.cat().encode("utf-8")
+            ).hexdigest()
+            previous = self.groups.get(group)
+            if previous is not None and previous[0] == signature:
+                # Only the tree is reused; rows and features always come from the current frame
+                groups[group] = (signature, rows, features, previous[3])
+                continue
+            groups[group] = (signature, rows, features, KDTree(features))
+            self.rebuilt.append(group)
+        self.groups = groups
+
+        # Filter columns as plain arrays; a missing value never passes a filter
+        self.values = self.players["Value"].to_numpy(dtype="float64", na_value=np.nan)
+        self.ages = self.players["Age"].to_numpy(dtype="float64", na_value=np.nan)
+        leagues = self.players.get("league", pd.Series(index=self.players.index, dtype=object))
+        self.leagues = leagues.astype(object).map(lambda v: v.casefold() if isinstance(v, str) else None).to_numpy()
+
+        self.lookup = {}
+        for column in ["Name", "fbref_id", "Player URL"]:
+            if column in self.players.columns:
+                keys = self.players[column].astype(object)
+                if column == "Name":
+                    keys = keys.map(normalize_name, na_action="ignore")
+                # Same name twice: the more valuable one is almost always the one meant
+                by_value = np.nan_to_num(self.values).argsort()
+                # Players without an fbref_id (or name, URL) would otherwise share one NaN key
+                by_value = by_value[keys.notna().to_numpy()[by_value]]
+                self.lookup.update(zip(keys.to_numpy()[by_value], by_value))
+        print(
+            f"🧭 Similarity index: {len(self.players)} players, rebuilt {self.rebuilt or 'nothing'} "
+            f"in {time.time() - start:.2f}s"
+        )
+        return self
+
+    # Row of a player by footballtransfers URL, fbref id or (normalized) name
+    def find(self, player):
+        row = self.lookup.get(player, self.lookup.get(normalize_name(player)))
+        if row is None:
+            raise KeyError(f"Unknown player: {player}")
+        return row
+
+    # 🔎 k most similar players in the same position group, after the filters
+    def most_similar(self, player, k=DEFAULT_K, max_value=None, max_age=None, min_age=None, league=None):
+        row = self.find(player)
+        _, rows, features, tree = self.groups[self.players.at[row, "group"]]
+
+        mask = rows != row
+        if max_value is not None:
+            mask &= self.values[rows] <= max_value
+        if max_age is not None:
+            mask &= self.ages[rows] <= max_age
+        if min_age is not None:
+            mask &= self.ages[rows] >= min_age
+        if league is not None:
+            mask &= self.leagues[rows] == league.casefold()
+
+        query = features[np.searchsorted(rows, row)]
+        hits = tree.query(query, k, mask)
+        result = self.players.iloc[rows[[local for _, local in hits]]]
+        result = result[[c for c in INFO_COLUMNS if c in result.columns]].copy()
+        result.insert(0, "distance", np.sqrt([d for d, _ in hits]))
+        return result
+
+
+# 🚀 Main Execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Players most like a given player")
+    parser.add_argument("player", help="name, footballtransfers URL or fbref id")
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    parser.add_argument("--max-value", type=float)
+    parser.add_argument("--max-age", type=int)
+    parser.add_argument("--min-age", type=int)
+    parser.add_argument("--league")
+    args = parser.parse_args()
+
+    index = SimilarityIndex().refresh()
+    start = time.perf_counter()
+    result = index.most_similar(
+        args.player,
+        k=args.k,
+        max_value=args.max_value,
+        max_age=args.max_age,
+        min_age=args.min_age,
+        league=args.league,
+    )
+    print(result.to_string(index=False))
+    print(f"⏱️ {(time.perf_counter() - start) * 1000:.2f} ms")
@@ -0,0 +1,41 @@
+import os
+
+# Real sites; each can be pointed elsewhere (e.g. mock_site.py) through the environment
+FOOTBALLTRANSFERS_DEFAULT = "https://www.footballtransfers.com"
+FBREF_DEFAULT = "https://fbref.com"
+DUCKDUCKGO_DEFAULT = "https://duckduckgo.com"
+
+# MOCK_SITE_URL=http://127.0.0.1:8900 points all three at one mock_site.py server
+MOCK_SITE_URL = os.environ.get("MOCK_SITE_URL", "").rstrip("/")
+
+
+def _base(variable, default, mock_prefix):
+    override = os.environ.get(variable)
+    if override:
+        return override.rstrip("/")
+    if MOCK_SITE_URL:
+        return f"{MOCK_SITE_URL}/{mock_prefix}"
+    return default
+
+
+FOOTBALLTRANSFERS = _base("FOOTBALLTRANSFERS_URL", FOOTBALLTRANSFERS_DEFAULT, "footballtransfers")
+FBREF = _base("FBREF_URL", FBREF_DEFAULT, "fbref")
+DUCKDUCKGO = _base("DUCKDUCKGO_URL", DUCKDUCKGO_DEFAULT, "duckduckgo")
+
+_REWRITES = [
+    (default, base)
+    for default, base in [
+        (FOOTBALLTRANSFERS_DEFAULT, FOOTBALLTRANSFERS),
+        (FBREF_DEFAULT, FBREF),
+        (DUCKDUCKGO_DEFAULT, DUCKDUCKGO),
+    ]
+    if default != base
+]
+
+
+# 🔀 Real-site URL (e.g. read from a CSV) → the same path on the overridden base
+def rewrite(url):
+    for default, base in _REWRITES:
+        if url.startswith(default):
+            return base + url[len(default):]
+    return url
@@ -1,4 +1,7 @@
-import requests
+import argparse
+import time
+
+from proxy_pool import TEST_URL, ProxyPool, load_proxies
 
 PROXIES = [
     "http://104.18.236.155:80",
@@ -10,13 +13,31 @@ PROXIES = [
     "http://185.162.229.146:80",
 ]
 
-TEST_URL = "https://httpbin.org/ip"
 TIMEOUT = 5  # seconds
 
-for proxy in PROXIES:
-    proxies = {"http": proxy, "https": proxy}
-    try:
-        response = requests.get(TEST_URL, proxies=proxies, timeout=TIMEOUT)
-        print(f"Proxy OK: {proxy} → IP seen: {response.json()['origin']}")
-    except Exception as e:
-        print(f"Proxy Failed: {proxy} → {e}")
+
+def print_table(pool):
+    for proxy, healthy, score, failure_rate, latency, ip in pool.table():
+        status = "OK    " if healthy else "EVICTED"
+        latency_text = f"{latency:.2f}s" if latency is not None else "  -  "
+        print(
+            f"{status} {proxy:<32} score {score:5.2f}  failures {failure_rate:4.0%}  "
+            f"latency {latency_text}  IP seen: {ip or '-'}"
+        )
+
+
+# 🚀 Main Execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Health-check proxies concurrently")
+    parser.add_argument("--rounds", type=int, default=1, help="checks per proxy, for a rolling score")
+    parser.add_argument("--url", default=TEST_URL)
+    args = parser.parse_args()
+
+    # proxies.txt / $PROXIES when configured, else the list above
+    pool = ProxyPool(load_proxies() or PROXIES, test_url=args.url, timeout=TIMEOUT)
+    for round_number in range(1, args.rounds + 1):
+        start = time.time()
+        # Evicted proxies are re-checked every round too, to show them coming back
+        pool.check_all(include_cooling=True)
+        print(f"\n🩺 Round {round_number}: {len(pool.states)} proxies checked in {time.time() - start:.1f}s")
+        print_table(pool)
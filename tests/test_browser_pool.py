@@ -0,0 +1,64 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_pool import BrowserPool, BrowserUnavailable  # noqa: E402
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+
+class FakeContext:
+    async def route(self, pattern, handler):
+        pass
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        pass
+
+
+# new_context fails while `crashed` is set, like a browser that went away
+class FakeBrowser:
+    def __init__(self):
+        self.crashed = False
+
+    async def new_context(self, **options):
+        if self.crashed:
+            raise RuntimeError("Browser has been closed")
+        return FakeContext()
+
+
+# 💥 Failed context rebuilds must hand the slot back instead of draining the pool
+def test_pool_survives_failed_recycles():
+    async def scenario():
+        browser = FakeBrowser()
+        async with BrowserPool(browser, size=2) as pool:
+            browser.crashed = True
+            for _ in range(pool.size * 3):
+                with pytest.raises((RuntimeError, BrowserUnavailable)):
+                    async with pool.page():
+                        raise RuntimeError("navigation failed")
+            with pytest.raises(BrowserUnavailable):
+                async with pool.page():
+                    pass
+            assert pool._idle.qsize() == pool.size
+
+            # Once the browser is back, empty slots are rebuilt on use
+            browser.crashed = False
+            for _ in range(pool.size * 2):
+                async with asyncio.timeout(1):
+                    async with pool.page() as page:
+                        assert isinstance(page, FakePage)
+
+    asyncio.run(scenario())
@@ -0,0 +1,47 @@
+import glob
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from listing_parsers import HTMLParser, lxml, parse_html  # noqa: E402
+
+# Settings
+GOLDEN_DIR = os.path.join(ROOT, "tests", "golden")
+# Generated benchmark pages plus hand-written edge cases (missing club, flag, skill, value; entities)
+PAGES = sorted(glob.glob(os.path.join(ROOT, "benchmarks", "fixtures", "listing_*.html"))) + sorted(
+    glob.glob(os.path.join(GOLDEN_DIR, "listing_*.html"))
+)
+ENGINES = ["bs4"] + [name for name, module in [("lxml", lxml), ("selectolax", HTMLParser)] if module is not None]
+
+
+def golden_path(page):
+    return os.path.join(GOLDEN_DIR, os.path.basename(page).replace(".html", ".json"))
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+# 🔍 Every engine, the reference included, must reproduce the frozen records exactly
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("page", PAGES, ids=os.path.basename)
+def test_listing_matches_golden(page, engine):
+    expected = json.loads(read(golden_path(page)))
+    # Through JSON so tuples, ints and floats compare the way they were stored
+    actual = json.loads(json.dumps(parse_html(read(page), engine), ensure_ascii=False))
+    assert actual == expected
+
+
+if __name__ == "__main__":
+    # python tests/test_listing_parsers.py: rewrite the golden files from the BeautifulSoup reference
+    for page in PAGES:
+        records = parse_html(read(page), "bs4")
+        with open(golden_path(page), "w", encoding="utf-8", newline="\n") as f:
+            f.write(json.dumps(records, ensure_ascii=False, indent=1) + "\n")
+        print(f"✅ {golden_path(page)} ({len(records)} records)")
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from similarity import SimilarityIndex  # noqa: E402
+
+
+def players(rows):
+    df = pd.DataFrame(rows, columns=["Name", "group", "Age", "Rating", "Potential", "Value"])
+    df["Player URL"] = "https://example.com/" + df["Name"]
+    df["log_value"] = np.log10(df["Value"])
+    return df
+
+
+BEFORE = [
+    ("a", "DF", 24, 70, 75, 1e6),
+    ("b", "DF", 26, 72, 74, 2e6),
+    ("c", "FW", 22, 80, 88, 5e7),
+    ("d", "FW", 30, 78, 79, 3e7),
+]
+
+
+# 🔁 A refresh with a player inserted before another group must not reuse stale row positions
+def test_refresh_after_insert_in_other_group():
+    index = SimilarityIndex().refresh(players(BEFORE))
+    assert index.most_similar("c", k=1)["Name"].tolist() == ["d"]
+
+    inserted = BEFORE[:2] + [("e", "DF", 25, 71, 76, 1.5e6)] + BEFORE[2:]
+    index.refresh(players(inserted))
+
+    assert index.most_similar("c", k=1)["Name"].tolist() == ["d"]
+    assert index.most_similar("d", k=1)["Name"].tolist() == ["c"]
+    assert set(index.most_similar("a", k=2)["Name"]) == {"b", "e"}
+
+
+def test_unchanged_refresh_reuses_trees():
+    index = SimilarityIndex().refresh(players(BEFORE))
+    trees = {group: entry[3] for group, entry in index.groups.items()}
+    index.refresh(players(BEFORE))
+
+    assert index.rebuilt == []
+    assert all(index.groups[group][3] is tree for group, tree in trees.items())
@@ -1,21 +1,30 @@
 import os
+import queue
+import threading
 import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
 
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 from urllib3.exceptions import InsecureRequestWarning
 
-warnings.simplefilter("ignore", InsecureRequestWarning)
+import metrics
+import proxy_pool
 
-# Load and sort input CSV by index
-df = pd.read_csv("all_players_ratings_original.csv")
-df = df.sort_index()
+warnings.simplefilter("ignore", InsecureRequestWarning)
 
-# Output file path
-compiled_path = "compiled_transfers.csv"
+# Settings
+INPUT_CSV = "all_players_ratings_original.csv"
+compiled_path = "compiled_transfers.csv"  # Output file path
+CONCURRENCY = 8  # Worker threads; 1 gives the old sequential crawl
+PER_DOMAIN_LIMIT = 4  # Requests in flight per host, whatever CONCURRENCY is
+WRITE_BATCH_SIZE = 500  # Transfer rows buffered by the writer before a flush
+HEADERS = {"User-Agent": "Mozilla/5.0"}
 
 
 # Utility: Clean transfer fee string
@@ -39,77 +48,202 @@ def parse_fee(price_raw):
             return "N/A"
 
 
-# Worker function for scraping and writing a single player
-def scrape_and_write(index, url):
-    full_url = url + "/transfer-history"
+# 🔗 One keep-alive session shared by all workers
+def create_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=CONCURRENCY)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HEADERS)
+    session.verify = False
+    return session
+
+
+_domain_slots = {}
+_domain_slots_lock = threading.Lock()
+
+
+def domain_slot(url):
+    host = urlsplit(url).netloc
+    with _domain_slots_lock:
+        if host not in _domain_slots:
+            _domain_slots[host] = threading.BoundedSemaphore(PER_DOMAIN_LIMIT)
+        return _domain_slots[host]
+
+
+def fetch_transfer_page(session, full_url, ttl=None):
     for attempt in range(3):
+        if attempt:
+            metrics.FETCH_RETRIES.inc(stage="transfer_history")
         try:
-            print(f"Fetching: {full_url} (Attempt {attempt + 1})")
-            response = requests.get(
-                full_url, headers={"User-Agent": "Mozilla/5.0"}, verify=False
-            )
-            print(f"Status code: {response.status_code}")
+            with domain_slot(full_url):
+                response = proxy_pool.fetch(full_url, session=session, timeout=30, ttl=ttl)
             if response.status_code == 200:
-                break
+                return response.text
+            print(f"Status code {response.status_code}: {full_url} (Attempt {attempt + 1})")
             time.sleep(2**attempt)
         except Exception as e:
             print(f"Request error: {e}")
             time.sleep(2**attempt)
-    else:
-        print(f"Failed to fetch after retries: {full_url}")
-        return
-
-    try:
-        soup = BeautifulSoup(response.text, "html.parser")
-        player_name = (
-            soup.find("h1").get_text(strip=True)
-            if soup.find("h1")
-            else url.split("/")[-1]
+    print(f"Failed to fetch after retries: {full_url}")
+    return None
+
+
+def parse_transfer_history(html, index, url):
+    with metrics.PARSE_SECONDS.time(parser="transfer_history"):
+        player_transfers = _parse_transfer_rows(html, index, url)
+    metrics.PARSED_ROWS.inc(len(player_transfers), parser="transfer_history")
+    return player_transfers
+
+
+def _parse_transfer_rows(html, index, url):
+    soup = BeautifulSoup(html, "html.parser")
+    player_name = (
+        soup.find("h1").get_text(strip=True) if soup.find("h1") else url.split("/")[-1]
+    )
+
+    player_transfers = []
+    for row in soup.select("table tbody tr"):
+        cells = row.find_all("td")
+        if len(cells) < 3:
+            continue
+        date = cells[0].get_text(strip=True)
+        clubs = cells[1].select(".transfer-club__name")
+        from_club = clubs[0].get_text(strip=True) if len(clubs) > 0 else "N/A"
+        to_club = clubs[1].get_text(strip=True) if len(clubs) > 1 else "N/A"
+        price_raw = cells[2].get_text(strip=True)
+        fee = parse_fee(price_raw)
+
+        player_transfers.append(
+            {
+                "Player Index": index,
+                "Player": player_name,
+                "Transfer From": from_club,
+                "Transfer To": to_club,
+                "Date": date,
+                "Fee": fee,
+            }
         )
+    return player_transfers
 
-        transfer_rows = soup.select("table tbody tr")
-        print(f"{player_name}: Found {len(transfer_rows)} transfer rows")
-
-        player_transfers = []
-
-        for row in transfer_rows:
-            cells = row.find_all("td")
-            if len(cells) < 3:
-                continue
-            date = cells[0].get_text(strip=True)
-            clubs = cells[1].select(".transfer-club__name")
-            from_club = clubs[0].get_text(strip=True) if len(clubs) > 0 else "N/A"
-            to_club = clubs[1].get_text(strip=True) if len(clubs) > 1 else "N/A"
-            price_raw = cells[2].get_text(strip=True)
-            fee = parse_fee(price_raw)
-
-            player_transfers.append(
-                {
-                    "Player Index": index,
-                    "Player": player_name,
-                    "Transfer From": from_club,
-                    "Transfer To": to_club,
-                    "Date": date,
-                    "Fee": fee,
-                }
-            )
-
-        if player_transfers:
-            new_df = pd.DataFrame(player_transfers)
-            header = not os.path.exists(compiled_path)
-            new_df.to_csv(compiled_path, mode="a", index=False, header=header)
-            print(
-                f"Written {len(player_transfers)} transfers for {player_name} (Index {index})"
-            )
 
+# Worker function: fetch and parse a single player (writing is left to the writer)
+# None = fetch or parse failed, [] = the player has no transfers
+def scrape_player(session, index, url, ttl=None):
+    full_url = url + "/transfer-history"
+    html = fetch_transfer_page(session, full_url, ttl)
+    if html is None:
+        return None
+    try:
+        return parse_transfer_history(html, index, url)
     except Exception as e:
         print(f"Parsing error for {full_url}: {e}")
-
-
-# 🐢 Run scraping sequentially without concurrency
-for idx, url in tqdm(
-    df["Player URL"].items(), total=len(df), desc="Scraping sequentially"
-):
-    scrape_and_write(idx, url)
-
-print(" Done! All transfers saved to compiled_transfers.csv.")
+        return None
+
+
+# ✍️ Single writer thread: batches rows so workers never touch the CSV
+class TransferWriter(threading.Thread):
+    def __init__(self, path=compiled_path, batch_size=WRITE_BATCH_SIZE):
+        super().__init__(daemon=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=CONCURRENCY * 4)
+        self.written = 0
+        self._error = None
+
+    def put(self, transfers):
+        self.queue.put(transfers)
+        metrics.QUEUE_DEPTH.set(self.queue.qsize(), queue="transfer_writer")
+
+    def close(self):
+        self.queue.put(None)
+        self.join()
+        if self._error:
+            raise self._error
+
+    def _flush(self, batch):
+        if batch:
+            header = not os.path.exists(self.path)
+            with metrics.WRITE_SECONDS.time(sink="transfer_writer"):
+                pd.DataFrame(batch).to_csv(self.path, mode="a", index=False, header=header)
+            self.written += len(batch)
+            metrics.WRITTEN_ROWS.inc(len(batch), sink="transfer_writer")
+            batch.clear()
+
+    def run(self):
+        try:
+            batch = []
+            while (transfers := self.queue.get()) is not None:
+                batch.extend(transfers)
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+            self._flush(batch)
+        except Exception as e:
+            self._error = e
+            # Keep draining so scrape_players never blocks on a dead writer
+            while self.queue.get() is not None:
+                pass
+
+
+# Returns (transfers written, indexes of the players that could not be scraped)
+def scrape_players(players, path=compiled_path, ttl=None):
+    writer = TransferWriter(path)
+    writer.start()
+    failed = []
+
+    with create_session() as session, ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        futures = {executor.submit(scrape_player, session, idx, url, ttl): idx for idx, url in players.items()}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Scraping transfers"):
+            transfers = future.result()
+            if transfers is None:
+                failed.append(futures[future])
+            elif transfers:
+                writer.put(transfers)
+
+    writer.close()
+    return writer.written, failed
+
+
+# 🔁 Re-scrape only some players and swap their rows in the compiled file
+# ttl=0: revalidate every page, a copy cached by the last crawl is not a refresh
+def refresh_players(player_urls, ttl=0):
+    df = pd.read_csv(INPUT_CSV)
+    players = df.loc[df["Player URL"].isin(set(player_urls)), "Player URL"]
+    if players.empty:
+        return 0
+
+    fresh_path = compiled_path + ".refresh"
+    if os.path.exists(fresh_path):
+        os.remove(fresh_path)
+    written, failed = scrape_players(players, fresh_path, ttl)
+    fresh = pd.read_csv(fresh_path) if written else pd.DataFrame()
+    for index in failed:
+        print(f"⚠️ Kept the old transfer history of {players[index]}: re-scrape failed")
+
+    # Only players that were actually re-scraped lose their old rows
+    refreshed = players.index.difference(failed)
+    if os.path.exists(compiled_path):
+        compiled = pd.read_csv(compiled_path)
+        compiled = compiled[~compiled["Player Index"].isin(refreshed)]
+        fresh = pd.concat([compiled, fresh], ignore_index=True)
+    tmp_path = compiled_path + ".tmp"
+    fresh.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, compiled_path)
+    if os.path.exists(fresh_path):
+        os.remove(fresh_path)
+    print(f"🔁 Transfer history refreshed for {len(refreshed)} players ({written} transfers), {len(failed)} failed")
+    return len(refreshed)
+
+
+def main():
+    # Load and sort input CSV by index
+    df = pd.read_csv(INPUT_CSV)
+    df = df.sort_index()
+
+    metrics.start_exporter("transfer_history")
+    written, failed = scrape_players(df["Player URL"])
+    print(f" Done! {written} transfers saved to {compiled_path}, {len(failed)} players failed.")
+
+
+if __name__ == "__main__":
+    main()